@@ -2,14 +2,41 @@
 
 from __future__ import annotations
 
+import os
+
+# Cooperative IO for gunicorn's gevent workers; must run before other
+# imports. Opt-in so the plain dev server keeps working unpatched.
+if os.getenv("GEVENT_MONKEY_PATCH") == "1":
+    from gevent import monkey
+
+    monkey.patch_all()
+
+import asyncio
 import json
-from flask import Flask, render_template, request, jsonify
-from disease_rules import predict_risks, risk_score
-from weather_api import get_current_weather, get_historical_weather, get_outlook_weather
-from config import FEEDBACK_FILE, LABELS_FILE
+import time
+
+import orjson
+from flask import Flask, render_template, request, send_file, Response
+from disease_rules import predict_risks, predict_risks_batch, risk_score
+from weather_cache import cached_current, cached_historical, cached_outlook
+from config import CACHE_TTL_MINUTES, FEEDBACK_FILE, FEEDBACK_LOG, LABELS_FILE
 
 app = Flask(__name__)
 
+# Hardcoded city coordinates for demo
+_CITY_COORDS = {
+    "bengaluru": (12.9716, 77.5946),
+    "delhi": (28.6139, 77.2090),
+    "mumbai": (19.0760, 72.8777),
+    "chennai": (13.0827, 80.2707),
+    "kolkata": (22.5726, 88.3639),
+}
+
+
+def json_response(payload, status: int = 200) -> Response:
+    """Serialize a response payload with orjson (compact, ~several× faster)."""
+    return Response(orjson.dumps(payload), status=status, mimetype="application/json")
+
 
 def load_json_file(path):
     """Load JSON data from file."""
@@ -21,16 +48,32 @@ def load_json_file(path):
     return []
 
 
+def _import_legacy_feedback() -> None:
+    """One-time import of the legacy feedback.json array into the JSONL log."""
+    if FEEDBACK_LOG.exists() or not FEEDBACK_FILE.exists():
+        return
+    try:
+        entries = load_json_file(FEEDBACK_FILE)
+        with FEEDBACK_LOG.open("ab") as f:
+            for entry in entries:
+                f.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
+    except Exception as e:
+        print(f"Failed to import legacy feedback: {e}")
+
+
 def save_feedback(feedback_text: str, weather: dict, overall_risk: str) -> None:
-    """Save feedback to JSON file."""
+    """Append feedback to the JSONL log (O(1) per entry, no full rewrite)."""
     try:
-        data = load_json_file(FEEDBACK_FILE)
-        data.append({"text": feedback_text, "weather": weather, "overall": overall_risk})
-        FEEDBACK_FILE.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        entry = {"text": feedback_text, "weather": weather, "overall": overall_risk}
+        with FEEDBACK_LOG.open("ab") as f:
+            f.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
     except Exception as e:
         print(f"Failed to save feedback: {e}")
 
 
+_import_legacy_feedback()
+
+
 @app.route('/')
 def index():
     """Main page with location input."""
@@ -38,7 +81,7 @@ def index():
 
 
 @app.route('/weather', methods=['POST'])
-def get_weather():
+async def get_weather():
     """Get weather data and risks for location."""
     data = request.get_json()
     lat = data.get('lat')
@@ -47,43 +90,47 @@ def get_weather():
     
     # Handle city lookup
     if city and not lat and not lon:
-        city_coords = {
-            "bengaluru": (12.9716, 77.5946),
-            "delhi": (28.6139, 77.2090),
-            "mumbai": (19.0760, 72.8777),
-            "chennai": (13.0827, 80.2707),
-            "kolkata": (22.5726, 88.3639),
-        }
         city_key = city.lower().strip()
-        if city_key in city_coords:
-            lat, lon = city_coords[city_key]
+        if city_key in _CITY_COORDS:
+            lat, lon = _CITY_COORDS[city_key]
         else:
-            return jsonify({"error": "City not found"}), 400
+            return json_response({"error": "City not found"}, status=400)
     
     if not lat or not lon:
-        return jsonify({"error": "Location required"}), 400
-    
-    # Get weather and risks
-    weather = get_current_weather(lat, lon)
+        return json_response({"error": "Location required"}, status=400)
+
+    # Same TTL bucket -> same payload, so clients inside a cache window
+    # can skip the body entirely with If-None-Match.
+    ttl_bucket = int(time.time() // (CACHE_TTL_MINUTES * 60))
+    etag = f'"{round(lat, 3)}:{round(lon, 3)}:{ttl_bucket}"'
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304)
+
+    # Fetch current/historical/outlook concurrently (each TTL-cached),
+    # so endpoint latency is max(t1, t2, t3) rather than the sum.
+    weather, historical, outlook = await asyncio.gather(
+        asyncio.to_thread(cached_current, lat, lon),
+        asyncio.to_thread(cached_historical, lat, lon, days=2),
+        asyncio.to_thread(cached_outlook, lat, lon, days=7),
+    )
     risks = predict_risks(weather)
     overall = risk_score(weather)
-    
-    # Get historical data for comparison
-    historical = get_historical_weather(lat, lon, days=2)
     prev_risk = risk_score(historical[-1]) if len(historical) >= 1 else overall
-    
-    # Get outlook
-    outlook = get_outlook_weather(lat, lon, days=7)
-    
-    return jsonify({
+    # One vectorized pass over all outlook days instead of per-day calls
+    outlook_risks = predict_risks_batch(outlook)
+
+    response = json_response({
         "location": {"lat": lat, "lon": lon, "city": city},
         "weather": weather,
         "overall_risk": overall,
         "risks": risks,
         "historical": historical,
         "prev_risk": prev_risk,
-        "outlook": outlook
+        "outlook": outlook,
+        "outlook_risks": outlook_risks
     })
+    response.headers['ETag'] = etag
+    return response
 
 
 @app.route('/feedback', methods=['POST'])
@@ -96,17 +143,25 @@ def submit_feedback():
     
     if feedback_text:
         save_feedback(feedback_text, weather, overall_risk)
-        return jsonify({"success": True})
+        return json_response({"success": True})
     
-    return jsonify({"error": "Feedback text required"}), 400
+    return json_response({"error": "Feedback text required"}, status=400)
 
 
 @app.route('/feedback')
 def get_feedback():
-    """Get all feedback."""
-    feedback = load_json_file(FEEDBACK_FILE)
-    return jsonify(feedback)
+    """Get all feedback as NDJSON, served straight from the log file.
+
+    send_file uses the kernel sendfile path where available and
+    conditional=True keeps the ETag/If-Modified-Since handling, so the
+    log is never parsed or re-serialized on read.
+    """
+    if not FEEDBACK_LOG.exists():
+        return Response("", mimetype="application/x-ndjson")
+    return send_file(FEEDBACK_LOG, mimetype="application/x-ndjson", conditional=True)
 
 
 if __name__ == '__main__':
+    # Development server only. In production run IO-bound workers under:
+    #   GEVENT_MONKEY_PATCH=1 gunicorn -k gevent -w 4 --worker-connections 1000 app:app
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -29,15 +29,17 @@ def get_env(name: str, default: Optional[str] = None) -> Optional[str]:
 # API keys removed - using mock data only
 
 
-NOTIFICATIONS_FILE = DATA_DIR / "notifications.json"
+NOTIFICATIONS_FILE = DATA_DIR / "notifications.jsonl"
 
 # Weather provider and caching
 WEATHER_PROVIDER = get_env("WEATHER_PROVIDER", "openweather")
 CACHE_FILE = DATA_DIR / "cache.json"
 CACHE_TTL_MINUTES = int(get_env("CACHE_TTL_MINUTES", "30"))
 
-SNAPSHOTS_FILE = DATA_DIR / "snapshots.json"
-FEEDBACK_FILE = DATA_DIR / "feedback.json"
+SNAPSHOTS_FILE = DATA_DIR / "snapshots.json"  # legacy array format, imported once
+SNAPSHOTS_LOG = DATA_DIR / "snapshots.jsonl"
+FEEDBACK_FILE = DATA_DIR / "feedback.json"  # legacy array format, imported once
+FEEDBACK_LOG = DATA_DIR / "feedback.jsonl"
 LABELS_FILE = DATA_DIR / "labels.json"
 UIPREFS_FILE = DATA_DIR / "ui_prefs.json"
 ACTIONS_FILE = DATA_DIR / "actions.json"
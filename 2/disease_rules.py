@@ -2,20 +2,21 @@
 
 Exports:
 - predict_risks(weather) -> list of risk dicts
+- predict_risks_batch(weathers) -> list of risk-dict lists
 - risk_score(weather) -> overall risk level string
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
-
-Risk = Dict[str, str]
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional for single lookups
+    np = None
 
 
-def _risk_level_to_score(level: str) -> int:
-    mapping = {"Low": 1, "Medium": 2, "High": 3}
-    return mapping.get(level, 1)
+Risk = Dict[str, str]
 
 
 def _score_to_level(score: float) -> str:
@@ -26,74 +27,155 @@ def _score_to_level(score: float) -> str:
     return "Low"
 
 
-def predict_risks(weather: Dict[str, Any]) -> List[Risk]:
-    """Evaluate simple heuristics and return a list of risks.
-
-    Each item: {disease, risk_level, reason, suggestion}
-    """
-    t = float(weather.get("temperature", 0.0))
-    h = float(weather.get("humidity", 0.0))
-    r = float(weather.get("rainfall_last_24h", 0.0))
+# Branch codes per disease: 0=Low, 1=Medium rule, 2=High rule,
+# 3=Aphids cool-and-humid High sub-case (codes 2 and 3 share a reason).
+_MILDEW_BLAST_SCORE = (1, 2, 3)
+_APHID_SCORE = (1, 2, 2, 3)
 
-    risks: List[Risk] = []
 
-    # Powdery Mildew (wheat)
+def _risk_codes(t: float, h: float, r: float) -> Tuple[int, int, int]:
+    """Classify branch codes for (mildew, blast, aphids) without formatting."""
     if h > 70 and 20 < t < 30:
-        level = "High"
-        reason = f"Humidity {h:.0f}% and temperature {t:.1f}°C favor mildew."
-        suggestion = "Scout fields, apply sulfur or triazole fungicide if symptoms appear."
+        mildew = 2
     elif h > 60 and 18 < t < 32:
-        level = "Medium"
-        reason = f"Warm and humid conditions may favor mildew (H {h:.0f}%, T {t:.1f}°C)."
-        suggestion = "Monitor crop canopy; improve airflow and avoid excess nitrogen."
+        mildew = 1
     else:
-        level = "Low"
-        reason = "Conditions less favorable for mildew."
-        suggestion = "Routine monitoring."
-    risks.append({"disease": "Powdery Mildew (wheat)", "risk_level": level, "reason": reason, "suggestion": suggestion})
+        mildew = 0
 
-    # Rice Blast
     if r > 20 and 25 < t < 30:
-        level = "High"
-        reason = f"Heavy rain {r:.1f} mm and warm temps {t:.1f}°C favor blast."
-        suggestion = "Ensure balanced nitrogen; consider prophylactic fungicide in hotspots."
+        blast = 2
     elif r > 5 and 22 < t < 32:
-        level = "Medium"
-        reason = f"Recent rain {r:.1f} mm with suitable temps may support blast infection."
-        suggestion = "Improve drainage and monitor for lesions on leaves and nodes."
+        blast = 1
     else:
-        level = "Low"
-        reason = "Insufficient moisture/temperature alignment for blast."
-        suggestion = "Routine monitoring."
-    risks.append({"disease": "Rice Blast", "risk_level": level, "reason": reason, "suggestion": suggestion})
+        blast = 0
 
-    # Aphids (general)
     if h > 60 and t < 20:
-        level = "High" if t < 15 else "Medium"
-        reason = f"Cool (<20°C) and humid (>60%) conditions support aphid buildup. T={t:.1f}°C, H={h:.0f}%."
-        suggestion = "Check undersides of leaves; use neem oil or selective insecticide if needed."
+        aphids = 3 if t < 15 else 2
     elif h > 50 and t < 22:
-        level = "Medium"
-        reason = f"Mild temps and moderate humidity can support aphids. T={t:.1f}°C, H={h:.0f}%."
-        suggestion = "Encourage natural enemies; avoid broad-spectrum sprays."
+        aphids = 1
     else:
-        level = "Low"
-        reason = "Conditions less favorable for aphids."
-        suggestion = "Routine monitoring."
-    risks.append({"disease": "Aphids", "risk_level": level, "reason": reason, "suggestion": suggestion})
+        aphids = 0
+
+    return mildew, blast, aphids
+
+
+def _format_risks(mildew: int, blast: int, aphids: int, t: float, h: float, r: float) -> List[Risk]:
+    """Build the risk dicts for one sample from precomputed branch codes.
+
+    Reason strings are only formatted for non-Low cells; Low cells reuse
+    constant text.
+    """
+    risks: List[Risk] = []
+
+    if mildew == 2:
+        risks.append({
+            "disease": "Powdery Mildew (wheat)", "risk_level": "High",
+            "reason": f"Humidity {h:.0f}% and temperature {t:.1f}°C favor mildew.",
+            "suggestion": "Scout fields, apply sulfur or triazole fungicide if symptoms appear.",
+        })
+    elif mildew == 1:
+        risks.append({
+            "disease": "Powdery Mildew (wheat)", "risk_level": "Medium",
+            "reason": f"Warm and humid conditions may favor mildew (H {h:.0f}%, T {t:.1f}°C).",
+            "suggestion": "Monitor crop canopy; improve airflow and avoid excess nitrogen.",
+        })
+    else:
+        risks.append({
+            "disease": "Powdery Mildew (wheat)", "risk_level": "Low",
+            "reason": "Conditions less favorable for mildew.",
+            "suggestion": "Routine monitoring.",
+        })
+
+    if blast == 2:
+        risks.append({
+            "disease": "Rice Blast", "risk_level": "High",
+            "reason": f"Heavy rain {r:.1f} mm and warm temps {t:.1f}°C favor blast.",
+            "suggestion": "Ensure balanced nitrogen; consider prophylactic fungicide in hotspots.",
+        })
+    elif blast == 1:
+        risks.append({
+            "disease": "Rice Blast", "risk_level": "Medium",
+            "reason": f"Recent rain {r:.1f} mm with suitable temps may support blast infection.",
+            "suggestion": "Improve drainage and monitor for lesions on leaves and nodes.",
+        })
+    else:
+        risks.append({
+            "disease": "Rice Blast", "risk_level": "Low",
+            "reason": "Insufficient moisture/temperature alignment for blast.",
+            "suggestion": "Routine monitoring.",
+        })
+
+    if aphids >= 2:
+        risks.append({
+            "disease": "Aphids", "risk_level": "High" if aphids == 3 else "Medium",
+            "reason": f"Cool (<20°C) and humid (>60%) conditions support aphid buildup. T={t:.1f}°C, H={h:.0f}%.",
+            "suggestion": "Check undersides of leaves; use neem oil or selective insecticide if needed.",
+        })
+    elif aphids == 1:
+        risks.append({
+            "disease": "Aphids", "risk_level": "Medium",
+            "reason": f"Mild temps and moderate humidity can support aphids. T={t:.1f}°C, H={h:.0f}%.",
+            "suggestion": "Encourage natural enemies; avoid broad-spectrum sprays.",
+        })
+    else:
+        risks.append({
+            "disease": "Aphids", "risk_level": "Low",
+            "reason": "Conditions less favorable for aphids.",
+            "suggestion": "Routine monitoring.",
+        })
 
     return risks
 
 
+def predict_risks(weather: Dict[str, Any]) -> List[Risk]:
+    """Evaluate simple heuristics and return a list of risks.
+
+    Each item: {disease, risk_level, reason, suggestion}
+    """
+    t = float(weather.get("temperature", 0.0))
+    h = float(weather.get("humidity", 0.0))
+    r = float(weather.get("rainfall_last_24h", 0.0))
+    mildew, blast, aphids = _risk_codes(t, h, r)
+    return _format_risks(mildew, blast, aphids, t, h, r)
+
+
+def predict_risks_batch(weathers: List[Dict[str, Any]]) -> List[List[Risk]]:
+    """Vectorized predict_risks over many weather samples (e.g. a 7-day outlook).
+
+    Stacks temperature/humidity/rainfall into NumPy arrays and evaluates
+    every threshold once per disease instead of per sample. Output is
+    identical to [predict_risks(w) for w in weathers].
+    """
+    if np is None or not weathers:
+        return [predict_risks(w) for w in weathers]
+
+    n = len(weathers)
+    t = np.fromiter((float(w.get("temperature", 0.0)) for w in weathers), dtype=np.float32, count=n)
+    h = np.fromiter((float(w.get("humidity", 0.0)) for w in weathers), dtype=np.float32, count=n)
+    r = np.fromiter((float(w.get("rainfall_last_24h", 0.0)) for w in weathers), dtype=np.float32, count=n)
+
+    mildew = np.select([(h > 70) & (t > 20) & (t < 30), (h > 60) & (t > 18) & (t < 32)], [2, 1], default=0)
+    blast = np.select([(r > 20) & (t > 25) & (t < 30), (r > 5) & (t > 22) & (t < 32)], [2, 1], default=0)
+    aphid_cool = (h > 60) & (t < 20)
+    aphids = np.select([aphid_cool & (t < 15), aphid_cool, (h > 50) & (t < 22)], [3, 2, 1], default=0)
+
+    return [
+        _format_risks(int(mildew[i]), int(blast[i]), int(aphids[i]), float(t[i]), float(h[i]), float(r[i]))
+        for i in range(n)
+    ]
+
+
 def risk_score(weather: Dict[str, Any]) -> str:
     """Aggregate risk across diseases into a single level.
 
-    Uses average of numeric scores and converts back to level.
+    Uses average of numeric branch scores and converts back to a level;
+    classification only, no reason-string formatting.
     """
-    risks = predict_risks(weather)
-    if not risks:
-        return "Low"
-    avg = sum(_risk_level_to_score(r["risk_level"]) for r in risks) / len(risks)
+    t = float(weather.get("temperature", 0.0))
+    h = float(weather.get("humidity", 0.0))
+    r = float(weather.get("rainfall_last_24h", 0.0))
+    mildew, blast, aphids = _risk_codes(t, h, r)
+    avg = (_MILDEW_BLAST_SCORE[mildew] + _MILDEW_BLAST_SCORE[blast] + _APHID_SCORE[aphids]) / 3.0
     return _score_to_level(avg)
 
 
@@ -113,9 +195,24 @@ def _run_basic_asserts() -> None:
     risks = predict_risks(w)
     assert any(r["disease"] == "Aphids" and r["risk_level"] in {"Medium", "High"} for r in risks)
 
+    # Batch evaluator matches the scalar path exactly
+    samples = [
+        {"temperature": 25, "humidity": 80, "rainfall_last_24h": 0},
+        {"temperature": 27, "humidity": 70, "rainfall_last_24h": 30},
+        {"temperature": 18, "humidity": 65, "rainfall_last_24h": 2},
+        {"temperature": 12, "humidity": 65, "rainfall_last_24h": 0},
+        {"temperature": 35, "humidity": 30, "rainfall_last_24h": 0},
+    ]
+    assert predict_risks_batch(samples) == [predict_risks(w) for w in samples]
+
+    # risk_score agrees with scoring the formatted risks
+    score_of = {"Low": 1, "Medium": 2, "High": 3}
+    for w in samples:
+        risks = predict_risks(w)
+        avg = sum(score_of[r["risk_level"]] for r in risks) / len(risks)
+        assert risk_score(w) == _score_to_level(avg)
+
 
 if __name__ == "__main__":
     _run_basic_asserts()
     print("Disease rule asserts passed.")
-
-
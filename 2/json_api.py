@@ -10,11 +10,23 @@ from __future__ import annotations
 
 import argparse
 import json
+
+import orjson
 from typing import Any, Dict
 
-from disease_rules import predict_risks, risk_score
+from disease_rules import predict_risks, predict_risks_batch, risk_score
 from weather_api import get_current_weather, get_historical_weather, get_outlook_weather
-from config import FEEDBACK_FILE, LABELS_FILE
+from config import FEEDBACK_FILE, FEEDBACK_LOG, LABELS_FILE
+
+
+# Hardcoded city coordinates for demo
+_CITY_COORDS = {
+    "bengaluru": (12.9716, 77.5946),
+    "delhi": (28.6139, 77.2090),
+    "mumbai": (19.0760, 72.8777),
+    "chennai": (13.0827, 80.2707),
+    "kolkata": (22.5726, 88.3639),
+}
 
 
 def load_json_file(path) -> Any:
@@ -26,25 +38,40 @@ def load_json_file(path) -> Any:
     return None
 
 
+def load_feedback() -> list:
+    """Load all feedback entries from the JSONL log (legacy array imported lazily)."""
+    try:
+        if not FEEDBACK_LOG.exists() and FEEDBACK_FILE.exists():
+            entries = load_json_file(FEEDBACK_FILE) or []
+            with FEEDBACK_LOG.open("ab") as f:
+                for entry in entries:
+                    f.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
+        if FEEDBACK_LOG.exists():
+            lines = FEEDBACK_LOG.read_bytes().splitlines()
+            return [orjson.loads(line) for line in lines if line.strip()]
+    except Exception:
+        pass
+    return []
+
+
 def save_feedback(feedback_text: str, weather: Dict[str, Any], overall_risk: str) -> None:
-    """Save feedback to JSON file."""
+    """Append feedback to the JSONL log (O(1) per entry, no full rewrite)."""
     try:
-        data = load_json_file(FEEDBACK_FILE) or []
-        data.append({"text": feedback_text, "weather": weather, "overall": overall_risk})
-        FEEDBACK_FILE.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        entry = {"text": feedback_text, "weather": weather, "overall": overall_risk}
+        with FEEDBACK_LOG.open("ab") as f:
+            f.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
     except Exception as e:
         print(f"Failed to save feedback: {e}")
 
 
 def generate_advisory_text(overall_risk: str, risks: list) -> str:
-    """Generate advisory text for export."""
-    lines = [f"Overall Risk: {overall_risk}", ""]
-    for r in risks:
-        lines.append(f"- {r['disease']}: {r['risk_level']}")
-        lines.append(f"  Reason: {r['reason']}")
-        lines.append(f"  Suggestion: {r['suggestion']}")
-        lines.append("")
-    return "\n".join(lines)
+    """Generate advisory text for export (single-pass, no intermediate list)."""
+    return f"Overall Risk: {overall_risk}\n\n" + "\n".join(
+        f"- {r['disease']}: {r['risk_level']}\n"
+        f"  Reason: {r['reason']}\n"
+        f"  Suggestion: {r['suggestion']}\n"
+        for r in risks
+    )
 
 
 def main() -> None:
@@ -64,17 +91,9 @@ def main() -> None:
     lat = args.lat
     lon = args.lon
     if (lat is None or lon is None) and args.city:
-        # Hardcoded city coordinates for demo
-        city_coords = {
-            "bengaluru": (12.9716, 77.5946),
-            "delhi": (28.6139, 77.2090),
-            "mumbai": (19.0760, 72.8777),
-            "chennai": (13.0827, 80.2707),
-            "kolkata": (22.5726, 88.3639),
-        }
         city_key = args.city.lower().strip()
-        if city_key in city_coords:
-            lat, lon = city_coords[city_key]
+        if city_key in _CITY_COORDS:
+            lat, lon = _CITY_COORDS[city_key]
         else:
             # Default to Bengaluru
             lat, lon = 12.9716, 77.5946
@@ -94,11 +113,14 @@ def main() -> None:
     }
 
     if args.include_outlook:
-        result["outlook"] = get_outlook_weather(lat, lon, days=args.days)
+        outlook = get_outlook_weather(lat, lon, days=args.days)
+        result["outlook"] = outlook
+        # One vectorized pass over all outlook days instead of per-day calls
+        result["outlook_risks"] = predict_risks_batch(outlook)
     if args.include_historical:
         result["historical"] = get_historical_weather(lat, lon, days=3)
     if args.include_feedback:
-        result["feedback"] = load_json_file(FEEDBACK_FILE) or []
+        result["feedback"] = load_feedback()
     if args.include_labels:
         result["labels"] = load_json_file(LABELS_FILE) or []
 
@@ -1,24 +1,27 @@
 import os
 import io
-import uuid
-import shutil
 from typing import List, Dict, Any
 
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from PIL import Image
 import numpy as np
 
+# libjpeg-turbo's SIMD decoder is typically 2-4x faster than PIL on JPEG;
+# optional dependency, PIL remains the fallback for all formats.
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB  # type: ignore
+    _turbo = TurboJPEG()
+except Exception:
+    _turbo = None
+
 # ----------------------------------------------------------------------------
 # Configuration via environment variables
 # ----------------------------------------------------------------------------
 MODEL_PATH = os.getenv('MODEL_PATH', '')  # e.g., ./models/leaf_model.h5
 ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', 'http://localhost:5173').split(',')
 MAX_UPLOAD_MB = float(os.getenv('MAX_UPLOAD_MB', '5'))
-TEMP_DIR = os.getenv('TEMP_DIR', os.path.join(os.path.dirname(__file__), 'tmp'))
-
-os.makedirs(TEMP_DIR, exist_ok=True)
 
 # ----------------------------------------------------------------------------
 # Disease labels and suggestions
@@ -135,12 +138,26 @@ SUGGESTIONS: Dict[str, List[str]] = {
 # Model adapter with mock inference; pluggable backends
 # ----------------------------------------------------------------------------
 
+# Constant index/boost vectors for the mock heuristic, built once at import so
+# predict_proba applies each disease-family boost with a single fancy-indexed
+# add instead of a Python loop of dict lookups.
+_LABEL_IDX = {name: i for i, name in enumerate(DISEASE_LABELS)}
+_IDX_RED = np.array([_LABEL_IDX[n] for n in ('Rust', 'Leaf Spot', 'Anthracnose')])
+_F_RED = np.array([3.0, 2.0, 1.2], dtype=np.float32)
+_IDX_MILDEW = np.array([_LABEL_IDX[n] for n in ('Powdery Mildew', 'Downy Mildew')])
+_IDX_BLIGHT = np.array([_LABEL_IDX[n] for n in ('Blight', 'Early Blight', 'Late Blight')])
+_IDX_VIRAL = np.array([_LABEL_IDX[n] for n in (
+    'Mosaic Virus', 'Leaf Curl Virus', 'Yellow Leaf Curl Virus', 'Banana Streak/Stripe Viruses')])
+_IDX_BACTERIAL = np.array([_LABEL_IDX[n] for n in ('Bacterial Leaf Spot', 'Bacterial Blight', 'Canker')])
+_IDX_GLS = _LABEL_IDX['Gray Leaf Spot']
+
 class ModelAdapter:
     def __init__(self, model_path: str | None):
         self.model_path = model_path or ''
         self.backend = None
         self.model = None
         self.input_size = (224, 224)
+        self._scratch = None  # reusable float32 buffer for real backends
         self._load_model()
 
     def _load_model(self) -> None:
@@ -171,91 +188,87 @@ class ModelAdapter:
         # Fallback to mock if no successful load
         self.backend = 'mock'
 
-    def preprocess(self, pil_image: Image.Image) -> Any:
+    def preprocess(self, pil_image: Image.Image) -> np.ndarray:
+        """Decode and resize to a (H, W, 3) uint8 array.
+
+        Float conversion is deferred to _to_float_input so the mock path
+        (which only needs channel means) never allocates float32.
+        """
         image = pil_image.convert('RGB').resize(self.input_size)
-        array = np.asarray(image).astype('float32') / 255.0
+        return np.asarray(image)
+
+    def _to_float_input(self, u8: np.ndarray) -> np.ndarray:
+        """Normalize uint8 HWC into a reused float32 buffer and add batch dim."""
+        if self._scratch is None or self._scratch.shape != u8.shape:
+            self._scratch = np.empty(u8.shape, dtype=np.float32)
+        np.divide(u8, 255.0, out=self._scratch)
+        array = self._scratch
         # HWC -> for TF: (1, H, W, C); for Torch: (1, C, H, W)
         if self.backend == 'torchscript':
             array = np.transpose(array, (2, 0, 1))  # CHW
-        array = np.expand_dims(array, 0)
-        return array
+        return np.expand_dims(array, 0)
 
-    def predict_proba(self, input_tensor: Any) -> List[float]:
+    def predict_proba(self, input_tensor: np.ndarray) -> np.ndarray:
         if self.backend == 'tensorflow':
             import tensorflow as tf  # type: ignore
-            preds = self.model.predict(input_tensor, verbose=0)
-            probs = preds[0].tolist()
-            return self._softmax(probs)
+            preds = self.model.predict(self._to_float_input(input_tensor), verbose=0)
+            return self._softmax(preds[0])
         if self.backend == 'torchscript':
             import torch  # type: ignore
             with torch.no_grad():
-                tensor = torch.from_numpy(input_tensor).float()
+                tensor = torch.from_numpy(self._to_float_input(input_tensor)).float()
                 outputs = self.model(tensor)
-                probs = torch.softmax(outputs, dim=1)[0].tolist()
-                return probs
-        # Mock backend: produce varied probabilities across all classes using simple color heuristics
-        img = input_tensor[0]
-        if img.ndim == 3 and img.shape[0] == 3:  # CHW (torch-style)
-            r, g, b = img[0], img[1], img[2]
-        else:  # HWC (tf-style)
-            r, g, b = img[:, :, 0], img[:, :, 1], img[:, :, 2]
-        r_mean = float(np.mean(r))
-        g_mean = float(np.mean(g))
-        b_mean = float(np.mean(b))
+                return torch.softmax(outputs, dim=1)[0].numpy()
+        # Mock backend: produce varied probabilities across all classes using
+        # simple color heuristics. One pass over the uint8 image (150 KB)
+        # instead of a float32 copy (600 KB).
+        means = input_tensor.mean(axis=(0, 1)) * (1.0 / 255.0)
+        r_mean, g_mean, b_mean = (float(x) for x in means)
         brightness = (r_mean + g_mean + b_mean) / 3.0
 
         n = len(DISEASE_LABELS)
         logits = np.ones((n,), dtype=np.float32) * 0.3
 
-        idx = {name: i for i, name in enumerate(DISEASE_LABELS)}
-
         # Red dominance -> Rust, Leaf Spot, Anthracnose
         red_boost = max(r_mean - 0.4, 0.0)
-        for name, factor in [('Rust', 3.0), ('Leaf Spot', 2.0), ('Anthracnose', 1.2)]:
-            logits[idx[name]] += red_boost * factor
+        logits[_IDX_RED] += red_boost * _F_RED
 
         # Green vs others -> mildews (Powdery/Downy)
         green_adv = max(g_mean - max(r_mean, b_mean), 0.0)
-        for name in ['Powdery Mildew', 'Downy Mildew']:
-            logits[idx[name]] += green_adv * 2.5
+        logits[_IDX_MILDEW] += green_adv * 2.5
 
         # Darkness -> Blights
         dark = max(0.5 - brightness, 0.0)
-        for name in ['Blight', 'Early Blight', 'Late Blight']:
-            logits[idx[name]] += dark * 3.0
+        logits[_IDX_BLIGHT] += dark * 3.0
 
         # Contrast -> viral family
         contrast = float(np.std([r_mean, g_mean, b_mean]))
-        for name in ['Mosaic Virus', 'Leaf Curl Virus', 'Yellow Leaf Curl Virus', 'Banana Streak/Stripe Viruses']:
-            logits[idx[name]] += contrast * 1.2
+        logits[_IDX_VIRAL] += contrast * 1.2
 
         # Bacterial: red and green high relative to blue
         bacterial_signal = max(min(r_mean, g_mean) - b_mean, 0.0)
-        for name in ['Bacterial Leaf Spot', 'Bacterial Blight', 'Canker']:
-            logits[idx[name]] += bacterial_signal * 1.8
+        logits[_IDX_BACTERIAL] += bacterial_signal * 1.8
 
         # Gray Leaf Spot: moderate brightness with low blue component
         gls_signal = max((r_mean + g_mean) / 2 - b_mean - 0.05, 0.0)
-        logits[idx['Gray Leaf Spot']] += gls_signal * 1.5
+        logits[_IDX_GLS] += gls_signal * 1.5
 
         # Normalize to softmax
         logits = logits - np.max(logits)
         exp = np.exp(logits)
-        probs = (exp / np.sum(exp)).astype(np.float32)
-        return probs.tolist()
+        return (exp / np.sum(exp)).astype(np.float32)
 
     @staticmethod
-    def _softmax(values: List[float]) -> List[float]:
-        arr = np.array(values, dtype=np.float32)
+    def _softmax(values: Any) -> np.ndarray:
+        arr = np.asarray(values, dtype=np.float32)
         arr = arr - np.max(arr)
         exp = np.exp(arr)
-        probs = exp / np.sum(exp)
-        return probs.tolist()
+        return exp / np.sum(exp)
 
 
 model_adapter = ModelAdapter(MODEL_PATH)
 
-app = FastAPI(title='Leaf Disease Detection API')
+app = FastAPI(title='Leaf Disease Detection API', default_response_class=ORJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
@@ -265,6 +278,16 @@ app.add_middleware(
 )
 
 
+def decode_image(contents: bytes, content_type: str) -> Image.Image:
+    """Decode upload bytes, preferring turbojpeg for JPEG payloads."""
+    if _turbo is not None and 'jpeg' in content_type:
+        try:
+            return Image.fromarray(_turbo.decode(contents, pixel_format=TJPF_RGB))
+        except Exception:
+            pass  # fall through to PIL on malformed/unsupported JPEGs
+    return Image.open(io.BytesIO(contents))
+
+
 def validate_image(upload: UploadFile) -> None:
     content_type = (upload.content_type or '').lower()
     if not content_type.startswith('image/'):
@@ -279,42 +302,40 @@ async def detect(image: UploadFile = File(...)):
     validate_image(image)
 
     size_limit = int(MAX_UPLOAD_MB * 1024 * 1024)
-    # Read content with size guard
-    contents = await image.read()
-    if len(contents) > size_limit:
-        raise HTTPException(status_code=413, detail='Image too large (max 5 MB).')
-
-    # Save to temp file
-    uid = str(uuid.uuid4())
-    ext = os.path.splitext(image.filename or '')[1]
-    safe_name = f'{uid}{ext}'
-    tmp_path = os.path.join(TEMP_DIR, safe_name)
-    with open(tmp_path, 'wb') as f:
-        f.write(contents)
+    # Read in bounded chunks so an oversize upload is rejected as soon as
+    # it crosses the limit instead of after buffering the whole body.
+    buf = bytearray()
+    while True:
+        chunk = await image.read(65536)
+        if not chunk:
+            break
+        buf.extend(chunk)
+        if len(buf) > size_limit:
+            raise HTTPException(status_code=413, detail='Image too large (max 5 MB).')
+    contents = bytes(buf)
 
     try:
-        pil = Image.open(io.BytesIO(contents))
+        pil = decode_image(contents, (image.content_type or '').lower())
         input_tensor = model_adapter.preprocess(pil)
-        probs = model_adapter.predict_proba(input_tensor)
-        # Normalize just in case
-        probs_np = np.array(probs, dtype=np.float32)
-        probs_np = probs_np / np.sum(probs_np)
-        probs = probs_np.tolist()
-
+        # predict_proba already returns softmax'd probabilities; sort once
+        # via argsort instead of round-tripping through lists.
+        probs = np.asarray(model_adapter.predict_proba(input_tensor), dtype=np.float32)
+        order = np.argsort(-probs)
         predictions = [
             { 'label': DISEASE_LABELS[i], 'probability': float(probs[i]) }
-            for i in range(len(DISEASE_LABELS))
+            for i in order
         ]
-        predictions.sort(key=lambda x: x['probability'], reverse=True)
         top = predictions[0]
-        confidence = float(top['probability'])
+        confidence = top['probability']
 
         notes = ''
-        sugg = dict(SUGGESTIONS)
+        # SUGGESTIONS is never mutated; hand the response the constant
+        # itself rather than shallow-copying 17 entries per request.
+        sugg = SUGGESTIONS
         if confidence < 0.5:
             notes = 'If confidence < 0.5, show low_confidence suggestions'
 
-        return JSONResponse({
+        return ORJSONResponse({
             'predictions': predictions,
             'top_prediction': top,
             'suggestions': sugg,
@@ -325,12 +346,6 @@ async def detect(image: UploadFile = File(...)):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail='Inference failed') from e
-    finally:
-        # Clean up temp file
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
 
 
 @app.get('/api/health')
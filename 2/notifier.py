@@ -1,15 +1,28 @@
-"""Notification utilities (SMS via Twilio and in-app JSON store)."""
+"""Notification utilities (SMS via Twilio and in-app JSONL store)."""
 
 from __future__ import annotations
 
-import json
+import atexit
+import threading
 import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+
+import orjson
 
 from config import NOTIFICATIONS_FILE
 
 
+# In-app notifications are buffered and appended to a JSONL file in batches,
+# so each call costs O(1) instead of re-serializing the whole store.
+BATCH_MAX = 64
+FLUSH_INTERVAL_SEC = 1.0
+
+_buf: List[bytes] = []
+_buf_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
 def send_sms(phone: str, message: str) -> bool:
     """Mock SMS sender for demo purposes.
 
@@ -19,18 +32,40 @@ def send_sms(phone: str, message: str) -> bool:
     return True
 
 
-def send_inapp_notification(payload: Dict[str, Any]) -> Path:
-    """Append a notification payload to a local JSON file and return its path."""
+def _flush_locked() -> None:
+    """Write buffered notification lines to disk. Caller holds _buf_lock."""
+    global _last_flush
+    if not _buf:
+        _last_flush = time.monotonic()
+        return
     NOTIFICATIONS_FILE.parent.mkdir(exist_ok=True, parents=True)
-    data = []
-    if NOTIFICATIONS_FILE.exists():
-        try:
-            data = json.loads(NOTIFICATIONS_FILE.read_text(encoding="utf-8"))
-        except Exception:
-            data = []
+    with NOTIFICATIONS_FILE.open("ab") as f:
+        f.writelines(_buf)
+    _buf.clear()
+    _last_flush = time.monotonic()
+
+
+def flush_notifications() -> None:
+    """Flush any buffered notifications to disk."""
+    with _buf_lock:
+        _flush_locked()
+
+
+def send_inapp_notification(payload: Dict[str, Any]) -> Path:
+    """Queue a notification payload for the local JSONL file and return its path.
+
+    The payload is buffered in-process and flushed when the buffer reaches
+    BATCH_MAX entries or FLUSH_INTERVAL_SEC has elapsed since the last flush.
+    """
     payload = {"ts": int(time.time()), **payload}
-    data.append(payload)
-    NOTIFICATIONS_FILE.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    line = orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+    with _buf_lock:
+        _buf.append(line)
+        if len(_buf) >= BATCH_MAX or time.monotonic() - _last_flush >= FLUSH_INTERVAL_SEC:
+            _flush_locked()
     return NOTIFICATIONS_FILE
 
 
+atexit.register(flush_notifications)
+
+
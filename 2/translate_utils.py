@@ -4,27 +4,50 @@ from __future__ import annotations
 
 from typing import Optional
 import json
+import threading
 from pathlib import Path
 from config import UIPREFS_FILE
 
 
+# Translator is constructed once on first use; the import drags in httpx &
+# friends, so we never retry after a failed import/construct.
+_translator = None
+_translator_failed = False
+_translator_lock = threading.Lock()
+
+
+def _get_translator():
+    global _translator, _translator_failed
+    if _translator is None and not _translator_failed:
+        with _translator_lock:
+            if _translator is None and not _translator_failed:
+                try:
+                    from googletrans import Translator  # type: ignore
+
+                    _translator = Translator()
+                except Exception:
+                    _translator_failed = True
+    return _translator
+
+
 def translate(text: str, target_language: str) -> str:
     """Translate text to target_language (e.g., 'hi' for Hindi, 'kn' for Kannada).
 
     Falls back to a mock translation suffix if googletrans isn't available.
     """
-    try:
-        from googletrans import Translator  # type: ignore
-
-        translator = Translator()
-        result = translator.translate(text, dest=target_language)
-        return result.text
-    except Exception:
-        suffix = {
-            "hi": "[HI]",
-            "kn": "[KN]",
-        }.get(target_language.lower(), f"[{target_language.upper()}]")
-        return f"{text} {suffix}"
+    if target_language.lower() == "en":
+        return text
+    translator = _get_translator()
+    if translator is not None:
+        try:
+            return translator.translate(text, dest=target_language).text
+        except Exception:
+            pass
+    suffix = {
+        "hi": "[HI]",
+        "kn": "[KN]",
+    }.get(target_language.lower(), f"[{target_language.upper()}]")
+    return f"{text} {suffix}"
 
 
 def get_ui_language(default: str = "en") -> str:
@@ -7,64 +7,148 @@ weather_description, wind_speed, timestamp (ISO 8601).
 
 from __future__ import annotations
 
-import datetime as dt
 from typing import Any, Dict, Optional, Tuple, List
 
 from config import (
     CACHE_FILE,
     CACHE_TTL_MINUTES,
     SNAPSHOTS_FILE,
+    SNAPSHOTS_LOG,
     WEATHER_PROVIDER,
 )
-import json
+from collections import deque
+import atexit
+import functools
+import os
 import time
-import random
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
+import numpy as np
+from pathlib import Path
 
-def _generate_mock_weather(lat: float, lon: float) -> Dict[str, Any]:
-    """Generate deterministic mock weather based on location."""
-    random.seed(int(lat * 1000 + lon))  # Deterministic based on location
-    
+import orjson
+
+
+def atomic_write_json(path: Path, obj: Any) -> None:
+    """Write JSON atomically: serialize to a sibling temp file, then os.replace.
+
+    Concurrent writers can no longer leave a half-written file behind.
+    """
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(orjson.dumps(obj))
+    os.replace(tmp, path)
+
+
+_DESCRIPTIONS = ("clear sky", "few clouds", "scattered clouds", "broken clouds", "overcast clouds", "light rain", "moderate rain")
+_OUTLOOK_DESCRIPTIONS = _DESCRIPTIONS[:6]
+
+
+def _qkey(lat: float, lon: float) -> Tuple[int, int]:
+    """Quantize lat/lon to fixed-point integers (1e-4 degree resolution)."""
+    return int(lat * 10000), int(lon * 10000)
+
+
+def _location_rng(lat: float, lon: float, offset: int = 0) -> np.random.Generator:
+    """Deterministic per-location generator; no global RNG reseeding.
+
+    The seed is an integer mix of the quantized coordinates, which disperses
+    nearby locations far better than the old int(lat*1000+lon).
+    """
+    qlat, qlon = _qkey(lat, lon)
+    seed = qlat * 1_000_003 + qlon * 7_919 + 11
+    return np.random.Generator(np.random.PCG64(seed + offset))
+
+
+def _draw_base(rng: np.random.Generator, lat: float) -> Tuple[float, int, float, float, str]:
+    """Draw the base (temp, humidity, rainfall, wind, description) stats."""
     # Simulate realistic weather patterns
     base_temp = 25.0 + (lat - 12.0) * 0.5  # Warmer near equator
-    temp_variation = random.uniform(-3, 3)
-    temp_c = round(base_temp + temp_variation, 1)
-    
-    humidity = random.randint(60, 85)
-    rainfall = random.uniform(0, 25) if random.random() > 0.6 else 0
-    wind_speed = random.uniform(1, 8)
-    
-    descriptions = ["clear sky", "few clouds", "scattered clouds", "broken clouds", "overcast clouds", "light rain", "moderate rain"]
-    desc = random.choice(descriptions)
-    
-    now_iso = dt.datetime.utcnow().isoformat()
-    
+    temp_c = round(base_temp + rng.uniform(-3, 3), 1)
+
+    humidity = int(rng.integers(60, 86))
+    rainfall = float(rng.uniform(0, 25)) if rng.random() > 0.6 else 0
+    wind_speed = float(rng.uniform(1, 8))
+
+    desc = _DESCRIPTIONS[rng.integers(0, len(_DESCRIPTIONS))]
+    return temp_c, humidity, rainfall, wind_speed, desc
+
+
+def _generate_mock_weather(lat: float, lon: float) -> Dict[str, Any]:
+    """Generate deterministic mock weather based on location."""
+    temp_c, humidity, rainfall, wind_speed, desc = _draw_base(_location_rng(lat, lon), lat)
+
     return {
         "temperature": temp_c,
         "humidity": humidity,
         "rainfall_last_24h": round(rainfall, 1),
         "weather_description": desc,
         "wind_speed": round(wind_speed, 1),
-        "timestamp": now_iso,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
     }
 
 
+# Hoisted so each key build concatenates onto a ready-made prefix
+_KEY_PREFIX = f"{WEATHER_PROVIDER}:"
+
+
+@functools.lru_cache(maxsize=1024)
+def _cache_key_cached(qlat: int, qlon: int) -> str:
+    return f"{_KEY_PREFIX}{qlat}:{qlon}"
+
+
 def _cache_key(lat: float, lon: float) -> str:
-    return f"{WEATHER_PROVIDER}:{round(lat,4)}:{round(lon,4)}"
+    return _cache_key_cached(*_qkey(lat, lon))
+
+
+def _normalize_key(key: Optional[str]) -> Optional[str]:
+    """Rewrite a legacy "provider:12.9716:77.5946" float key to the
+    quantized fixed-point form so old snapshots keep matching lookups."""
+    if not key or not key.startswith(_KEY_PREFIX):
+        return key
+    coords = key[len(_KEY_PREFIX):].split(":")
+    if len(coords) != 2 or not ("." in coords[0] or "." in coords[1]):
+        return key  # already quantized (or not a coordinate key)
+    try:
+        return _cache_key(float(coords[0]), float(coords[1]))
+    except ValueError:
+        return key
+
+
+# Provider cache is held in memory after the first read and flushed once at
+# exit (when dirty) instead of re-parsing/re-serializing the file per lookup.
+_CACHE: Optional[Dict[str, Any]] = None
+_CACHE_DIRTY = False
 
 
 def _read_cache() -> Dict[str, Any]:
-    if CACHE_FILE.exists():
+    global _CACHE
+    if _CACHE is None:
+        # EAFP: one open instead of a stat followed by an open
+        try:
+            _CACHE = orjson.loads(CACHE_FILE.read_bytes())
+        except Exception:
+            _CACHE = {}
+    return _CACHE
+
+
+def _flush_cache() -> None:
+    """Persist the in-memory cache, merging with whatever is on disk."""
+    global _CACHE_DIRTY
+    if not _CACHE_DIRTY or _CACHE is None:
+        return
+    try:
         try:
-            return json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+            data: Dict[str, Any] = orjson.loads(CACHE_FILE.read_bytes())
         except Exception:
-            return {}
-    return {}
+            data = {}
+        data.update(_CACHE)
+        atomic_write_json(CACHE_FILE, data)
+        _CACHE_DIRTY = False
+    except Exception:
+        pass
 
 
-def _write_cache(data: Dict[str, Any]) -> None:
-    CACHE_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+atexit.register(_flush_cache)
 
 
 def _get_cached_weather(lat: float, lon: float) -> Optional[Dict[str, Any]]:
@@ -80,10 +164,11 @@ def _get_cached_weather(lat: float, lon: float) -> Optional[Dict[str, Any]]:
 
 
 def _set_cached_weather(lat: float, lon: float, weather: Dict[str, Any]) -> None:
+    global _CACHE_DIRTY
     cache = _read_cache()
     key = _cache_key(lat, lon)
     cache[key] = {"ts": int(time.time()), "weather": weather}
-    _write_cache(cache)
+    _CACHE_DIRTY = True
 
 
 def get_current_weather(lat: float, lon: float) -> Dict[str, Any]:
@@ -100,56 +185,115 @@ def get_current_weather(lat: float, lon: float) -> Dict[str, Any]:
     return result
 
 
+def get_current_weather_batch(coords: List[Tuple[float, float]]) -> List[Dict[str, Any]]:
+    """Fetch current weather for many (lat, lon) pairs in one pass.
+
+    The cache is consulted in memory per coordinate; misses are generated
+    and written back, so the whole batch touches the cache structures once
+    per entry with no per-call file I/O. When a real provider replaces the
+    mock generator, the misses can be fetched concurrently here.
+    """
+    results: List[Dict[str, Any]] = []
+    for lat, lon in coords:
+        weather = _get_cached_weather(lat, lon)
+        if weather is None:
+            weather = _generate_mock_weather(lat, lon)
+            _set_cached_weather(lat, lon, weather)
+        results.append(weather)
+    return results
+
+
+def _migrate_snapshots() -> None:
+    """One-time conversion of the legacy snapshots.json array to the JSONL log."""
+    if SNAPSHOTS_LOG.exists():
+        return
+    try:
+        snaps = orjson.loads(SNAPSHOTS_FILE.read_bytes())
+    except Exception:
+        # No legacy file (or unreadable) - nothing to import
+        return
+    with SNAPSHOTS_LOG.open("ab") as f:
+        for s in snaps:
+            if isinstance(s, dict):
+                s["key"] = _normalize_key(s.get("key"))
+            f.write(orjson.dumps(s, option=orjson.OPT_APPEND_NEWLINE))
+
+
+@functools.lru_cache(maxsize=4)
+def _read_snapshots_cached(mtime_ns: int) -> List[Tuple[str, Dict[str, Any]]]:
+    """Parse the snapshot log once per on-disk version (keyed by mtime)."""
+    entries: List[Tuple[str, Dict[str, Any]]] = []
+    with SNAPSHOTS_LOG.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                s = orjson.loads(line)
+            except Exception:
+                continue
+            # Normalize here too: logs migrated before keys were
+            # quantized still carry the float spelling
+            entries.append((_normalize_key(s.get("key")), s["weather"]))
+    return entries
+
+
 def get_historical_weather(lat: float, lon: float, days: int = 3) -> List[Dict[str, Any]]:
     """Mock/simple historical using cached snapshots; extend with real provider later."""
-    if SNAPSHOTS_FILE.exists():
-        try:
-            snaps = json.loads(SNAPSHOTS_FILE.read_text(encoding="utf-8"))
-        except Exception:
-            snaps = []
-    else:
-        snaps = []
+    _migrate_snapshots()
     key = _cache_key(lat, lon)
-    hist = [s["weather"] for s in snaps if s.get("key") == key]
-    return hist[-days:]
+    try:
+        entries = _read_snapshots_cached(os.stat(SNAPSHOTS_LOG).st_mtime_ns)
+    except FileNotFoundError:
+        return []
+    hist: deque = deque(maxlen=days)
+    for entry_key, weather in entries:
+        if entry_key == key:
+            hist.append(weather)
+    return list(hist)
+
+
+def _outlook_batch(lat: float, lon: float, days: int) -> List[Dict[str, Any]]:
+    """Draw the base stats and all per-day deltas from one generator stream.
+
+    One seed, one stream: the base draw and every vectorized per-day draw
+    continue the same RNG, so there are no per-day seed resets at all.
+    """
+    rng = _location_rng(lat, lon)
+    base_temp, base_humidity, _, _, _ = _draw_base(rng, lat)
+
+    temp_var = rng.uniform(-2, 2, days)
+    hum_var = rng.integers(-10, 11, days)
+    rain_chance = rng.random(days)
+    rain = np.where(rain_chance > 0.7, rng.uniform(0, 20, days), 0.0)
+    wind = rng.uniform(1, 8, days)
+    desc_idx = rng.integers(0, len(_OUTLOOK_DESCRIPTIONS), days)
+
+    now = datetime.now(timezone.utc)
+    timestamps = [(now + timedelta(days=i)).isoformat() for i in range(days)]
+
+    return [
+        {
+            "temperature": round(base_temp + float(temp_var[i]), 1),
+            "humidity": max(40, min(95, base_humidity + int(hum_var[i]))),
+            "rainfall_last_24h": round(float(rain[i]), 1),
+            "weather_description": _OUTLOOK_DESCRIPTIONS[desc_idx[i]],
+            "wind_speed": round(float(wind[i]), 1),
+            "timestamp": timestamps[i],
+        }
+        for i in range(days)
+    ]
 
 
 def get_outlook_weather(lat: float, lon: float, days: int = 7) -> List[Dict[str, Any]]:
     """Generate mock 7–14 day outlook using deterministic variation."""
-    daily: List[Dict[str, Any]] = []
-    base_weather = _generate_mock_weather(lat, lon)
-    
-    for i in range(days):
-        # Add some variation for each day
-        random.seed(int(lat * 1000 + lon) + i)
-        
-        temp_variation = random.uniform(-2, 2)
-        hum_variation = random.randint(-10, 10)
-        rain_chance = random.random()
-        
-        day_weather = {
-            "temperature": round(base_weather["temperature"] + temp_variation, 1),
-            "humidity": max(40, min(95, base_weather["humidity"] + hum_variation)),
-            "rainfall_last_24h": round(random.uniform(0, 20) if rain_chance > 0.7 else 0, 1),
-            "weather_description": random.choice(["clear sky", "few clouds", "scattered clouds", "broken clouds", "overcast clouds", "light rain"]),
-            "wind_speed": round(random.uniform(1, 8), 1),
-            "timestamp": (datetime.utcnow() + timedelta(days=i)).isoformat(),
-        }
-        daily.append(day_weather)
-    
-    return daily
+    return _outlook_batch(lat, lon, days)
 
 
 def save_snapshot(lat: float, lon: float, weather: Dict[str, Any]) -> None:
+    """Append one snapshot line to the JSONL log (O(1), no full rewrite)."""
+    _migrate_snapshots()
     entry = {"key": _cache_key(lat, lon), "weather": weather, "ts": int(time.time())}
-    if SNAPSHOTS_FILE.exists():
-        try:
-            snaps = json.loads(SNAPSHOTS_FILE.read_text(encoding="utf-8"))
-        except Exception:
-            snaps = []
-    else:
-        snaps = []
-    snaps.append(entry)
-    SNAPSHOTS_FILE.write_text(json.dumps(snaps, indent=2), encoding="utf-8")
+    with SNAPSHOTS_LOG.open("ab") as f:
+        f.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
 
 
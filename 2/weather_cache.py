@@ -0,0 +1,87 @@
+"""In-memory TTL cache for weather lookups.
+
+Keys round (lat, lon) to a 3-decimal grid so nearby requests share an
+entry. Entries are persisted into CACHE_FILE at shutdown (under a
+"memo:" prefix, alongside the provider cache) and reloaded at startup.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import time
+from typing import Any, Dict, Tuple
+
+from config import CACHE_FILE, CACHE_TTL_MINUTES
+from weather_api import (
+    atomic_write_json,
+    get_current_weather,
+    get_historical_weather,
+    get_outlook_weather,
+)
+
+
+_TTL_SEC = CACHE_TTL_MINUTES * 60
+_PREFIX = "memo:"
+
+# key -> (expiry_ts, payload)
+_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+def _key(kind: str, lat: float, lon: float, days: int = 0) -> str:
+    return f"{_PREFIX}{kind}:{round(lat, 3)}:{round(lon, 3)}:{days}"
+
+
+def _load() -> None:
+    try:
+        if CACHE_FILE.exists():
+            data = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+            now = time.time()
+            for key, entry in data.items():
+                if key.startswith(_PREFIX) and entry.get("expiry", 0) > now:
+                    _cache[key] = (entry["expiry"], entry["payload"])
+    except Exception:
+        pass
+
+
+def _save() -> None:
+    try:
+        data = {}
+        if CACHE_FILE.exists():
+            try:
+                data = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+            except Exception:
+                data = {}
+        now = time.time()
+        for key, (expiry, payload) in _cache.items():
+            if expiry > now:
+                data[key] = {"expiry": expiry, "payload": payload}
+        atomic_write_json(CACHE_FILE, data)
+    except Exception:
+        pass
+
+
+def _cached(key: str, fetch) -> Any:
+    entry = _cache.get(key)
+    now = time.time()
+    if entry and now < entry[0]:
+        return entry[1]
+    payload = fetch()
+    _cache[key] = (now + _TTL_SEC, payload)
+    return payload
+
+
+def cached_current(lat: float, lon: float) -> Dict[str, Any]:
+    return _cached(_key("current", lat, lon), lambda: get_current_weather(lat, lon))
+
+
+def cached_historical(lat: float, lon: float, days: int = 3) -> list:
+    return _cached(_key("historical", lat, lon, days), lambda: get_historical_weather(lat, lon, days=days))
+
+
+def cached_outlook(lat: float, lon: float, days: int = 7) -> list:
+    return _cached(_key("outlook", lat, lon, days), lambda: get_outlook_weather(lat, lon, days=days))
+
+
+_load()
+atexit.register(_save)
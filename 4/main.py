@@ -5,13 +5,13 @@ Provides both CLI and programmatic interfaces.
 
 import sys
 import os
-import yaml
 import logging
 
 # Add current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from modules.cli import PlantCareCLI, cli
+from modules.config_loader import load_yaml
 
 # Configure logging
 logging.basicConfig(
@@ -24,9 +24,8 @@ logger = logging.getLogger(__name__)
 def main():
     """Main function to run the CLI application."""
     try:
-        # Load configuration
-        with open("config.yaml", 'r') as f:
-            config = yaml.safe_load(f)
+        # Load configuration (memoized, C loader when available)
+        config = load_yaml("config.yaml")
         
         app_config = config['app']
         
@@ -47,11 +46,12 @@ def main():
 
 
 def analyze_image_programmatically(
-    image_path: str,
+    image_path: str = None,
     crop_type: str = None,
     growth_stage: str = None,
     location: str = None,
-    language: str = "en"
+    language: str = "en",
+    image_bytes: bytes = None
 ) -> dict:
     """
     Analyze a plant image programmatically.
@@ -62,6 +62,7 @@ def analyze_image_programmatically(
         growth_stage: Optional growth stage
         location: Optional location
         language: Farmer's preferred language
+        image_bytes: In-memory image data; when given, no file is read
         
     Returns:
         Analysis results dictionary
@@ -72,7 +73,8 @@ def analyze_image_programmatically(
         crop_type=crop_type,
         growth_stage=growth_stage,
         location=location,
-        language=language
+        language=language,
+        image_bytes=image_bytes
     )
 
 
@@ -4,37 +4,81 @@ Provides a simple CLI for image analysis and treatment recommendations.
 """
 
 import click
+import io
 import json
-import yaml
+import mmap
 from pathlib import Path
 from typing import Optional
-from .inference import InferenceEngine
-from .recommender import RecommendationEngine
-from .formatter import ResponseFormatter
+from .config_loader import load_yaml
+
+try:
+    import orjson
+
+    def _json_dump_bytes(data: dict) -> bytes:
+        # orjson emits UTF-8 bytes (no ASCII escaping), matching ensure_ascii=False
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _json_dump_bytes(data: dict) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode()
 
 
 class PlantCareCLI:
-    """Command-line interface for the plant care system."""
-    
+    """Command-line interface for the plant care system.
+
+    The inference, recommendation and formatter engines are constructed
+    lazily on first use, so subcommands that never touch the model (e.g.
+    ``diseases`` or ``treatment``) skip the model-load cost entirely.
+    """
+
     def __init__(self, config_path: str = "config.yaml"):
         """Initialize the CLI with configuration."""
         self.config_path = config_path
-        self.inference_engine = InferenceEngine(config_path)
-        self.recommendation_engine = RecommendationEngine("diseases.yml", config_path)
-        self.formatter = ResponseFormatter(config_path)
-        
-        # Load configuration
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
-    
+        self._inference_engine = None
+        self._recommendation_engine = None
+        self._formatter = None
+
+        # Load configuration (memoized, C loader when available)
+        self.config = load_yaml(config_path)
+
+        # O(1) format dispatch instead of an if/elif chain per call
+        self._formatters = {
+            "json": self._format_json_output,
+            "text": self._format_text_output,
+            "table": self._format_table_output,
+        }
+
+    @property
+    def inference_engine(self):
+        """Lazily constructed InferenceEngine (loads model weights)."""
+        if self._inference_engine is None:
+            from .inference import InferenceEngine
+            self._inference_engine = InferenceEngine(self.config_path)
+        return self._inference_engine
+
+    @property
+    def recommendation_engine(self):
+        """Lazily constructed RecommendationEngine."""
+        if self._recommendation_engine is None:
+            from .recommender import RecommendationEngine
+            self._recommendation_engine = RecommendationEngine("diseases.yml", self.config_path)
+        return self._recommendation_engine
+
+    @property
+    def formatter(self):
+        """Lazily constructed ResponseFormatter."""
+        if self._formatter is None:
+            from .formatter import ResponseFormatter
+            self._formatter = ResponseFormatter(self.config_path)
+        return self._formatter
+
     def analyze_image(
         self,
-        image_path: str,
+        image_path: Optional[str] = None,
         crop_type: Optional[str] = None,
         growth_stage: Optional[str] = None,
         location: Optional[str] = None,
         language: str = "en",
-        output_format: str = "json"
+        image_bytes: Optional[bytes] = None
     ) -> dict:
         """
         Analyze a plant image and provide recommendations.
@@ -45,18 +89,30 @@ class PlantCareCLI:
             growth_stage: Optional growth stage
             location: Optional location
             language: Farmer's preferred language
-            output_format: Output format (json, text, table)
+            image_bytes: In-memory image data; when given, no file is read
             
         Returns:
             Analysis results dictionary
         """
         try:
-            # Read image file
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
-            
-            # Process image through inference
-            inference_result = self.inference_engine.process_image(image_data, Path(image_path).name)
+            if image_bytes is not None:
+                # Already in memory (e.g. a web upload): no file round-trip
+                inference_result = self.inference_engine.process_image(
+                    image_bytes, Path(image_path).name if image_path else "upload.jpg"
+                )
+            else:
+                # Memory-map the image so the decoder reads it without an extra
+                # multi-MB bytes copy; the view is released before unmapping.
+                with open(image_path, 'rb') as f:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        image_data = memoryview(mm)
+                        try:
+                            # Process image through inference
+                            inference_result = self.inference_engine.process_image(
+                                image_data, Path(image_path).name
+                            )
+                        finally:
+                            image_data.release()
             
             # Get disease information
             disease_id = inference_result["disease"]["id"]
@@ -138,14 +194,15 @@ class PlantCareCLI:
             Dictionary with list of diseases
         """
         try:
-            diseases = []
-            for disease_id, disease_info in self.recommendation_engine.diseases_db.items():
-                diseases.append({
+            diseases = [
+                {
                     "id": disease_id,
                     "name": disease_info["name"],
-                    "remedy_count": len(disease_info.get("remedies", []))
-                })
-            
+                    "remedy_count": len(disease_info.get("remedies", ()))
+                }
+                for disease_id, disease_info in self.recommendation_engine.diseases_db.items()
+            ]
+
             return {"diseases": diseases}
             
         except Exception as e:
@@ -196,108 +253,126 @@ class PlantCareCLI:
         Returns:
             Formatted string
         """
-        if output_format == "json":
-            return json.dumps(data, indent=2, ensure_ascii=False)
-        
-        elif output_format == "text":
-            return self._format_text_output(data)
-        
-        elif output_format == "table":
-            return self._format_table_output(data)
-        
-        else:
-            return json.dumps(data, indent=2, ensure_ascii=False)
-    
+        formatter = self._formatters.get(output_format, self._format_json_output)
+        return formatter(data)
+
+    def format_output_bytes(self, data: dict, output_format: str) -> bytes:
+        """
+        Format output data as UTF-8 bytes for direct terminal writes.
+
+        The JSON path serializes straight to bytes (no str round trip);
+        text/table are encoded once. click.echo accepts bytes as-is.
+        """
+        if output_format == "json" or output_format not in self._formatters:
+            return _json_dump_bytes(data)
+        return self._formatters[output_format](data).encode()
+
+    def _format_json_output(self, data: dict) -> str:
+        """Format data as indented JSON (orjson when available)."""
+        return _json_dump_bytes(data).decode()
+
     def _format_text_output(self, data: dict) -> str:
         """Format data as human-readable text."""
         if data.get("error"):
             return f"Error: {data['message']}"
-        
-        output = []
-        
+
+        # Write into one growable buffer instead of a list of fragments
+        buf = io.StringIO()
+        w = buf.write
+
         # Disease information
         if "disease" in data:
             disease = data["disease"]
-            output.append(f"🌱 Disease: {disease['name']}")
+            w(f"🌱 Disease: {disease['name']}\n")
             if 'confidence' in disease:
-                output.append(f"📊 Confidence: {disease['confidence']:.1%}")
-            output.append("")
-        
+                w(f"📊 Confidence: {disease['confidence']:.1%}\n")
+            w("\n")
+
         # Treatments
         if "recommended_treatments" in data:
             treatments = data["recommended_treatments"]
             if treatments:
-                output.append("💊 Treatment Recommendations:")
-                output.append("=" * 50)
-                
+                w("💊 Treatment Recommendations:\n")
+                w("=" * 50)
+                w("\n")
+
                 for i, treatment in enumerate(treatments, 1):
-                    output.append(f"\n{i}. {treatment['name']} ({treatment['type'].upper()})")
-                    output.append(f"   Dosage: {treatment['dosage']}")
-                    output.append(f"   Frequency: {treatment['frequency']}")
-                    output.append(f"   Best Time: {treatment['best_time']}")
-                    output.append(f"   Cost: {treatment['cost_estimate_per_hectare']}")
-                    
-                    if treatment['safety'].get('PPE'):
-                        output.append(f"   PPE Required: {', '.join(treatment['safety']['PPE'])}")
-                    
-                    if treatment['safety'].get('warning'):
-                        output.append(f"   ⚠️  Warning: {treatment['safety']['warning']}")
+                    safety = treatment['safety']
+                    w(f"\n{i}. {treatment['name']} ({treatment['type'].upper()})\n")
+                    w(f"   Dosage: {treatment['dosage']}\n")
+                    w(f"   Frequency: {treatment['frequency']}\n")
+                    w(f"   Best Time: {treatment['best_time']}\n")
+                    w(f"   Cost: {treatment['cost_estimate_per_hectare']}\n")
+
+                    if safety.get('PPE'):
+                        w(f"   PPE Required: {', '.join(safety['PPE'])}\n")
+
+                    if safety.get('warning'):
+                        w(f"   ⚠️  Warning: {safety['warning']}\n")
             else:
-                output.append("No specific treatments recommended.")
-        
+                w("No specific treatments recommended.\n")
+
         # Note: SDG information is available in the separate SDG UI
-        
+
         # Summary
         if "notes" in data:
-            output.append(f"\n📝 Summary: {data['notes']}")
-        
+            w(f"\n📝 Summary: {data['notes']}\n")
+
         # Warnings
         if "uncertainty_warning" in data and data["uncertainty_warning"]:
-            output.append(f"\n⚠️  {data['uncertainty_warning']}")
-        
-        return "\n".join(output)
-    
+            w(f"\n⚠️  {data['uncertainty_warning']}\n")
+
+        result = buf.getvalue()
+        return result[:-1] if result.endswith("\n") else result
+
     def _format_table_output(self, data: dict) -> str:
         """Format data as a table (simplified version)."""
         if data.get("error"):
             return f"Error: {data['message']}"
-        
-        output = []
-        
+
+        buf = io.StringIO()
+        w = buf.write
+
         # Disease information table
         if "disease" in data:
             disease = data["disease"]
-            output.append("DISEASE DETECTION")
-            output.append("=" * 50)
-            output.append(f"Name: {disease['name']}")
-            output.append(f"Confidence: {disease['confidence']:.1%}")
-            output.append("")
-        
+            w("DISEASE DETECTION\n")
+            w("=" * 50)
+            w("\n")
+            w(f"Name: {disease['name']}\n")
+            w(f"Confidence: {disease['confidence']:.1%}\n")
+            w("\n")
+
         # Treatments table
         if "recommended_treatments" in data:
             treatments = data["recommended_treatments"]
             if treatments:
-                output.append("TREATMENT RECOMMENDATIONS")
-                output.append("=" * 50)
-                
+                w("TREATMENT RECOMMENDATIONS\n")
+                w("=" * 50)
+                w("\n")
+
                 for i, treatment in enumerate(treatments, 1):
-                    output.append(f"\n{i}. {treatment['name']}")
-                    output.append(f"   Type: {treatment['type'].upper()}")
-                    output.append(f"   Dosage: {treatment['dosage']}")
-                    output.append(f"   Frequency: {treatment['frequency']}")
-                    output.append(f"   Cost: {treatment['cost_estimate_per_hectare']}")
-        
-        return "\n".join(output)
+                    w(f"\n{i}. {treatment['name']}\n")
+                    w(f"   Type: {treatment['type'].upper()}\n")
+                    w(f"   Dosage: {treatment['dosage']}\n")
+                    w(f"   Frequency: {treatment['frequency']}\n")
+                    w(f"   Cost: {treatment['cost_estimate_per_hectare']}\n")
+
+        result = buf.getvalue()
+        return result[:-1] if result.endswith("\n") else result
 
 
 # Click CLI commands
+_LANG_CHOICE = click.Choice(['en', 'es', 'fr', 'hi', 'pt'])
+_FMT_CHOICE = click.Choice(['json', 'text', 'table'])
+
+
 @click.group()
 @click.option('--config', default='config.yaml', help='Configuration file path')
 @click.pass_context
 def cli(ctx, config):
     """Sustainable Pesticide & Fertilizer Recommendation System CLI."""
-    ctx.ensure_object(dict)
-    ctx.obj['cli'] = PlantCareCLI(config)
+    ctx.obj = {'cli': PlantCareCLI(config)}
 
 
 @cli.command()
@@ -305,8 +380,8 @@ def cli(ctx, config):
 @click.option('--crop-type', help='Type of crop (e.g., Tomato, Rice)')
 @click.option('--growth-stage', type=click.Choice(['seedling', 'vegetative', 'flowering', 'fruiting', 'mature']), help='Growth stage')
 @click.option('--location', help='Geographic location')
-@click.option('--language', default='en', type=click.Choice(['en', 'es', 'fr', 'hi', 'pt']), help='Farmer language')
-@click.option('--output', 'output_format', default='json', type=click.Choice(['json', 'text', 'table']), help='Output format')
+@click.option('--language', default='en', type=_LANG_CHOICE, help='Farmer language')
+@click.option('--output', 'output_format', default='json', type=_FMT_CHOICE, help='Output format')
 @click.pass_context
 def analyze(ctx, image_path, crop_type, growth_stage, location, language, output_format):
     """Analyze a plant image for diseases and get treatment recommendations."""
@@ -317,17 +392,16 @@ def analyze(ctx, image_path, crop_type, growth_stage, location, language, output
         crop_type=crop_type,
         growth_stage=growth_stage,
         location=location,
-        language=language,
-        output_format=output_format
+        language=language
     )
     
-    click.echo(cli_instance.format_output(result, output_format))
+    click.echo(cli_instance.format_output_bytes(result, output_format))
 
 
 @cli.command()
 @click.argument('disease_id')
-@click.option('--language', default='en', type=click.Choice(['en', 'es', 'fr', 'hi', 'pt']), help='Farmer language')
-@click.option('--output', 'output_format', default='json', type=click.Choice(['json', 'text', 'table']), help='Output format')
+@click.option('--language', default='en', type=_LANG_CHOICE, help='Farmer language')
+@click.option('--output', 'output_format', default='json', type=_FMT_CHOICE, help='Output format')
 @click.pass_context
 def treatment(ctx, disease_id, language, output_format):
     """Get treatment information for a specific disease."""
@@ -335,11 +409,11 @@ def treatment(ctx, disease_id, language, output_format):
     
     result = cli_instance.get_treatment_info(disease_id, language)
     
-    click.echo(cli_instance.format_output(result, output_format))
+    click.echo(cli_instance.format_output_bytes(result, output_format))
 
 
 @cli.command()
-@click.option('--output', 'output_format', default='json', type=click.Choice(['json', 'text', 'table']), help='Output format')
+@click.option('--output', 'output_format', default='json', type=_FMT_CHOICE, help='Output format')
 @click.pass_context
 def diseases(ctx, output_format):
     """List all available diseases in the system."""
@@ -347,14 +421,14 @@ def diseases(ctx, output_format):
     
     result = cli_instance.list_diseases()
     
-    click.echo(cli_instance.format_output(result, output_format))
+    click.echo(cli_instance.format_output_bytes(result, output_format))
 
 
 @cli.command()
 @click.argument('disease_id')
 @click.argument('remedy_name')
 @click.argument('requested_dosage')
-@click.option('--output', 'output_format', default='json', type=click.Choice(['json', 'text', 'table']), help='Output format')
+@click.option('--output', 'output_format', default='json', type=_FMT_CHOICE, help='Output format')
 @click.pass_context
 def validate(ctx, disease_id, remedy_name, requested_dosage, output_format):
     """Validate dosage against anti-overuse rules."""
@@ -362,7 +436,7 @@ def validate(ctx, disease_id, remedy_name, requested_dosage, output_format):
     
     result = cli_instance.validate_dosage(disease_id, remedy_name, requested_dosage)
     
-    click.echo(cli_instance.format_output(result, output_format))
+    click.echo(cli_instance.format_output_bytes(result, output_format))
 
 
 if __name__ == '__main__':
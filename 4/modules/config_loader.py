@@ -0,0 +1,97 @@
+"""
+Shared YAML loading for the Sustainable Pesticide & Fertilizer Recommendation System.
+Uses libyaml's C loader when available and memoizes parses by path + mtime.
+"""
+
+import json
+import os
+from typing import Any, Dict, Tuple
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # libyaml not compiled in; pure-Python fallback
+    from yaml import SafeLoader as _Loader
+
+# real path -> ((mtime, size), parsed document)
+_cache: Dict[str, Tuple[Any, Any]] = {}
+
+
+def load_yaml(path: str) -> Any:
+    """Load a YAML file, reusing the parsed result until the file changes.
+
+    Path variants (relative, symlinked) coalesce onto one cache entry via
+    realpath; staleness is detected by (mtime, size) so same-second
+    rewrites of a different length still invalidate. Callers treat the
+    returned document as read-only.
+
+    Args:
+        path: Path to the YAML file
+
+    Returns:
+        Parsed YAML document
+    """
+    path = os.path.realpath(path)
+    try:
+        st = os.stat(path)
+        stamp = (st.st_mtime, st.st_size)
+    except OSError:
+        stamp = None
+
+    entry = _cache.get(path)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+
+    data = _load_sidecar(path)
+    if data is None:
+        with open(path, 'r') as f:
+            data = yaml.load(f, Loader=_Loader)
+        _write_sidecar(path, data)
+
+    _cache[path] = (stamp, data)
+    return data
+
+
+def _sidecar_path(path: str) -> str:
+    return path + '.cache.json'
+
+
+def _load_sidecar(path: str) -> Any:
+    """Read the JSON sidecar if it is at least as new as the YAML file.
+
+    json.loads is roughly an order of magnitude faster than YAML parsing
+    on the same document, so cold startups pay JSON cost instead.
+    """
+    sidecar = _sidecar_path(path)
+    try:
+        if os.stat(sidecar).st_mtime >= os.stat(path).st_mtime:
+            with open(sidecar, 'r') as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _write_sidecar(path: str, data: Any) -> None:
+    """Persist the parsed document as JSON next to the YAML, atomically.
+
+    Best effort: a read-only filesystem or non-JSON-serializable document
+    just means the next cold start parses YAML again.
+    """
+    sidecar = _sidecar_path(path)
+    tmp = sidecar + '.tmp'
+    try:
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, sidecar)
+    except (OSError, TypeError, ValueError):
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def invalidate_config() -> None:
+    """Drop all cached documents (for test teardown)."""
+    _cache.clear()
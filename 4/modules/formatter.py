@@ -3,79 +3,113 @@ Response formatting module for the Sustainable Pesticide & Fertilizer Recommenda
 Handles JSON response formatting, internationalization, and human-readable summaries.
 """
 
+import bisect
 import json
 import logging
-from typing import Dict, Any, Optional, List
+import re
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
+from .config_loader import load_yaml
 from .inference import InferenceEngine
 from .recommender import RecommendationEngine
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Translation strings (simplified - in real implementation, load from files).
+# Module-level so instances share one dict instead of rebuilding it per init.
+# Plain dicts (not MappingProxyType) because the labels go into JSON responses.
+_TRANSLATIONS: Dict[str, Dict[str, str]] = {
+    "en": {
+        "disease_detected": "Disease Detected",
+        "confidence": "Confidence",
+        "organic_treatment": "Organic Treatment",
+        "chemical_treatment": "Chemical Treatment",
+        "safety_warning": "Safety Warning",
+        "ppe_required": "PPE Required",
+        "pre_harvest_interval": "Pre-harvest Interval",
+        "cost_estimate": "Cost Estimate",
+        "frequency": "Frequency",
+        "best_time": "Best Time",
+        "uncertainty_warning": "Uncertainty Warning",
+        "sdg_alignment": "SDG Alignment"
+    },
+    "es": {
+        "disease_detected": "Enfermedad Detectada",
+        "confidence": "Confianza",
+        "organic_treatment": "Tratamiento Orgánico",
+        "chemical_treatment": "Tratamiento Químico",
+        "safety_warning": "Advertencia de Seguridad",
+        "ppe_required": "EPP Requerido",
+        "pre_harvest_interval": "Intervalo Pre-cosecha",
+        "cost_estimate": "Estimación de Costo",
+        "frequency": "Frecuencia",
+        "best_time": "Mejor Momento",
+        "uncertainty_warning": "Advertencia de Incertidumbre",
+        "sdg_alignment": "Alineación ODS"
+    },
+    "fr": {
+        "disease_detected": "Maladie Détectée",
+        "confidence": "Confiance",
+        "organic_treatment": "Traitement Biologique",
+        "chemical_treatment": "Traitement Chimique",
+        "safety_warning": "Avertissement de Sécurité",
+        "ppe_required": "EPI Requis",
+        "pre_harvest_interval": "Intervalle Pré-récolte",
+        "cost_estimate": "Estimation des Coûts",
+        "frequency": "Fréquence",
+        "best_time": "Meilleur Moment",
+        "uncertainty_warning": "Avertissement d'Incertitude",
+        "sdg_alignment": "Alignement ODD"
+    }
+}
+
+
+# Static classification tables for add_visual_indicators: type attributes,
+# safety level indexed by min(PPE count, 3), and cost buckets picked by bisect.
+_TYPE_ATTRS = {
+    "organic": {"icon": "🌱", "badge": "organic", "color": "green"},
+    "chemical": {"icon": "⚠️", "badge": "chemical", "color": "orange"},
+}
+_SAFETY_LEVELS = (("low", "✅"), ("medium", "⚠️"), ("medium", "⚠️"), ("high", "🚨"))
+_COST_RE = re.compile(r'USD\s+([\d.]+)')
+_COST_THRESHOLDS = (20.0, 50.0)
+_COST_LEVELS = (("low", "💰"), ("medium", "💰💰"), ("high", "💰💰💰"))
+
+
 class ResponseFormatter:
     """Handles response formatting and internationalization."""
-    
+
     def __init__(self, config_path: str = "config.yaml"):
         """Initialize the formatter."""
-        import yaml
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
-        
+        self.config = load_yaml(config_path)
+
         self.localization_config = self.config['localization']
         self.default_language = self.localization_config['default_language']
-        
-        # Load translations (simplified - in real implementation, load from files)
-        self.translations = self._load_translations()
-    
-    def _load_translations(self) -> Dict[str, Dict[str, str]]:
-        """Load translation strings for different languages."""
-        return {
-            "en": {
-                "disease_detected": "Disease Detected",
-                "confidence": "Confidence",
-                "organic_treatment": "Organic Treatment",
-                "chemical_treatment": "Chemical Treatment",
-                "safety_warning": "Safety Warning",
-                "ppe_required": "PPE Required",
-                "pre_harvest_interval": "Pre-harvest Interval",
-                "cost_estimate": "Cost Estimate",
-                "frequency": "Frequency",
-                "best_time": "Best Time",
-                "uncertainty_warning": "Uncertainty Warning",
-                "sdg_alignment": "SDG Alignment"
-            },
-            "es": {
-                "disease_detected": "Enfermedad Detectada",
-                "confidence": "Confianza",
-                "organic_treatment": "Tratamiento Orgánico",
-                "chemical_treatment": "Tratamiento Químico",
-                "safety_warning": "Advertencia de Seguridad",
-                "ppe_required": "EPP Requerido",
-                "pre_harvest_interval": "Intervalo Pre-cosecha",
-                "cost_estimate": "Estimación de Costo",
-                "frequency": "Frecuencia",
-                "best_time": "Mejor Momento",
-                "uncertainty_warning": "Advertencia de Incertidumbre",
-                "sdg_alignment": "Alineación ODS"
-            },
-            "fr": {
-                "disease_detected": "Maladie Détectée",
-                "confidence": "Confiance",
-                "organic_treatment": "Traitement Biologique",
-                "chemical_treatment": "Traitement Chimique",
-                "safety_warning": "Avertissement de Sécurité",
-                "ppe_required": "EPI Requis",
-                "pre_harvest_interval": "Intervalle Pré-récolte",
-                "cost_estimate": "Estimation des Coûts",
-                "frequency": "Fréquence",
-                "best_time": "Meilleur Moment",
-                "uncertainty_warning": "Avertissement d'Incertitude",
-                "sdg_alignment": "Alignement ODD"
-            }
+
+        self.translations = _TRANSLATIONS
+
+        # O(1) membership tests on the per-request language check
+        self._supported_langs = frozenset(self.localization_config['supported_languages'])
+
+        # Per-language labels with the default-language fallback pre-applied,
+        # so hot paths resolve labels with a single dict lookup.
+        default_labels = _TRANSLATIONS[self.default_language]
+        self._labels_by_lang = {
+            lang: _TRANSLATIONS.get(lang, default_labels)
+            for lang in self.localization_config['supported_languages']
         }
-    
+
+        # Health-check response cache; /health is pinged every few seconds
+        # by liveness probes and the payload only changes when the model
+        # flips between mock and real mode.
+        self._health_cache: Optional[Dict[str, Any]] = None
+        self._health_cache_key: Optional[Tuple[Any, ...]] = None
+
+    def _labels(self, farmer_language: str) -> Dict[str, str]:
+        """Resolve the label set for a language (default-language fallback)."""
+        return self._labels_by_lang.get(farmer_language, _TRANSLATIONS[self.default_language])
+
     def format_detection_response(
         self,
         inference_result: Dict[str, Any],
@@ -94,10 +128,15 @@ class ResponseFormatter:
             Formatted response dictionary
         """
         # Ensure language is supported
-        if farmer_language not in self.localization_config['supported_languages']:
+        if farmer_language not in self._supported_langs:
             farmer_language = self.default_language
         
-        # Combine inference and recommendation results
+        image_warning = inference_result.get("warning")
+        uncertainty_warning = recommendations.get("uncertainty_warning")
+
+        # Combine inference and recommendation results in one full-size
+        # literal so the dict never has to grow; the optional warning keys
+        # are dropped afterwards when absent.
         response = {
             "disease": inference_result["disease"],
             "recommended_treatments": recommendations["recommended_treatments"],
@@ -108,19 +147,17 @@ class ResponseFormatter:
                 "model_info": inference_result.get("model_info", {}),
                 "image_metadata": inference_result.get("image_metadata", {}),
                 "recommendation_metadata": recommendations.get("metadata", {})
-            }
+            },
+            "image_warning": image_warning,
+            "uncertainty_warning": uncertainty_warning,
+            "labels": self._labels(farmer_language),
         }
-        
-        # Add warnings if present
-        if inference_result.get("warning"):
-            response["image_warning"] = inference_result["warning"]
-        
-        if recommendations.get("uncertainty_warning"):
-            response["uncertainty_warning"] = recommendations["uncertainty_warning"]
-        
-        # Add localized labels
-        response["labels"] = self.translations.get(farmer_language, self.translations[self.default_language])
-        
+
+        if not image_warning:
+            del response["image_warning"]
+        if not uncertainty_warning:
+            del response["uncertainty_warning"]
+
         return response
     
     def format_treatment_lookup_response(
@@ -143,17 +180,17 @@ class ResponseFormatter:
                 "error": "Treatment not found",
                 "disease_id": None,
                 "treatments": [],
-                "labels": self.translations.get(farmer_language, self.translations[self.default_language])
+                "labels": self._labels(farmer_language)
             }
         
         # Ensure language is supported
-        if farmer_language not in self.localization_config['supported_languages']:
+        if farmer_language not in self._supported_langs:
             farmer_language = self.default_language
         
         return {
             "disease": treatment_data["disease"],
             "treatments": treatment_data["remedies"],
-            "labels": self.translations.get(farmer_language, self.translations[self.default_language]),
+            "labels": self._labels(farmer_language),
             "metadata": {
                 "language": farmer_language,
                 "source": "offline_lookup"
@@ -170,7 +207,13 @@ class ResponseFormatter:
         Returns:
             Health check response dictionary
         """
-        return {
+        # get_model_info() returns a fresh dict per call, so key the cache
+        # on the fields that can actually change at runtime.
+        key = (model_info.get("mock_mode"), model_info.get("model_loaded"))
+        if self._health_cache is not None and key == self._health_cache_key:
+            return self._health_cache
+
+        response = {
             "status": "healthy",
             "service": "Sustainable Pesticide & Fertilizer Recommendation System",
             "version": "1.0.0",
@@ -185,7 +228,16 @@ class ResponseFormatter:
             },
             "supported_languages": self.localization_config['supported_languages']
         }
-    
+
+        self._health_cache = response
+        self._health_cache_key = key
+        return response
+
+    def reset_health_cache(self) -> None:
+        """Drop the cached health payload (e.g. after a mock/real flip)."""
+        self._health_cache = None
+        self._health_cache_key = None
+
     def format_error_response(
         self,
         error_message: str,
@@ -204,7 +256,7 @@ class ResponseFormatter:
             Error response dictionary
         """
         # Ensure language is supported
-        if farmer_language not in self.localization_config['supported_languages']:
+        if farmer_language not in self._supported_langs:
             farmer_language = self.default_language
         
         return {
@@ -212,7 +264,7 @@ class ResponseFormatter:
             "error_code": error_code,
             "message": error_message,
             "language": farmer_language,
-            "labels": self.translations.get(farmer_language, self.translations[self.default_language])
+            "labels": self._labels(farmer_language)
         }
     
     def generate_human_summary(
@@ -234,34 +286,53 @@ class ResponseFormatter:
         """
         if not treatments:
             return f"No specific treatment needed for {disease_name}."
-        
-        # Get translations
-        labels = self.translations.get(farmer_language, self.translations[self.default_language])
-        
-        # Separate organic and chemical treatments
-        organic_treatments = [t for t in treatments if t['type'] == 'organic']
-        chemical_treatments = [t for t in treatments if t['type'] == 'chemical']
-        
+
+        # Normalize to a known language so the cache key matches labels
+        lang = farmer_language if farmer_language in self._labels_by_lang else self.default_language
+
+        top_organic = next((t for t in treatments if t['type'] == 'organic'), None)
+        top_chemical = next((t for t in treatments if t['type'] == 'chemical'), None)
+
+        organic_sig = (top_organic['name'], top_organic['dosage']) if top_organic else None
+        chemical_sig = (
+            top_chemical['name'],
+            top_chemical['dosage'],
+            tuple(top_chemical['safety'].get('PPE', ())),
+            top_chemical['safety'].get('pre_harvest_interval', '0'),
+        ) if top_chemical else None
+
+        return self._summary_cached(disease_name, lang, organic_sig, chemical_sig)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _summary_cached(
+        disease_name: str,
+        lang: str,
+        organic_sig: Optional[Tuple[str, str]],
+        chemical_sig: Optional[Tuple[str, str, Tuple[str, ...], Any]]
+    ) -> str:
+        """Build the summary string once per (disease, language, treatment) signature."""
+        labels = _TRANSLATIONS.get(lang, _TRANSLATIONS["en"])
+
         summary_parts = [f"{labels['disease_detected']}: {disease_name}"]
-        
-        if organic_treatments:
-            top_organic = organic_treatments[0]
+
+        if organic_sig:
+            name, dosage = organic_sig
             summary_parts.append(
-                f"{labels['organic_treatment']}: {top_organic['name']} "
-                f"({top_organic['dosage']})"
+                f"{labels['organic_treatment']}: {name} "
+                f"({dosage})"
             )
-        
-        if chemical_treatments:
-            top_chemical = chemical_treatments[0]
-            ppe_list = ", ".join(top_chemical['safety'].get('PPE', []))
-            phi = top_chemical['safety'].get('pre_harvest_interval', '0')
-            
+
+        if chemical_sig:
+            name, dosage, ppe, phi = chemical_sig
+            ppe_list = ", ".join(ppe)
+
             summary_parts.append(
-                f"{labels['chemical_treatment']}: {top_chemical['name']} "
-                f"({top_chemical['dosage']}) — {labels['ppe_required']}: {ppe_list} "
+                f"{labels['chemical_treatment']}: {name} "
+                f"({dosage}) — {labels['ppe_required']}: {ppe_list} "
                 f"— {labels['pre_harvest_interval']}: {phi} days"
             )
-        
+
         return " | ".join(summary_parts)
     
     def add_visual_indicators(self, treatments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -275,43 +346,29 @@ class ResponseFormatter:
             Treatments with added visual indicators
         """
         for treatment in treatments:
-            # Add type-specific icons
-            if treatment['type'] == 'organic':
-                treatment['icon'] = "🌱"
-                treatment['badge'] = "organic"
-                treatment['color'] = "green"
-            else:  # chemical
-                treatment['icon'] = "⚠️"
-                treatment['badge'] = "chemical"
-                treatment['color'] = "orange"
-            
-            # Add safety level indicators
-            ppe_count = len(treatment['safety'].get('PPE', []))
-            if ppe_count == 0:
-                treatment['safety_level'] = "low"
-                treatment['safety_icon'] = "✅"
-            elif ppe_count <= 2:
-                treatment['safety_level'] = "medium"
-                treatment['safety_icon'] = "⚠️"
-            else:
-                treatment['safety_level'] = "high"
-                treatment['safety_icon'] = "🚨"
-            
+            # Add type-specific icons (anything non-organic counts as chemical)
+            attrs = _TYPE_ATTRS.get(treatment['type'], _TYPE_ATTRS['chemical'])
+            treatment['icon'] = attrs['icon']
+            treatment['badge'] = attrs['badge']
+            treatment['color'] = attrs['color']
+
+            # Add safety level indicators via table lookup
+            ppe_count = len(treatment['safety'].get('PPE', ()))
+            level, icon = _SAFETY_LEVELS[min(ppe_count, 3)]
+            treatment['safety_level'] = level
+            treatment['safety_icon'] = icon
+
             # Add cost indicator
             cost_str = treatment.get('cost_estimate_per_hectare', 'USD 0')
             if 'USD 0' in cost_str:
                 treatment['cost_level'] = "free"
                 treatment['cost_icon'] = "💰"
-            elif 'USD' in cost_str:
-                cost_value = float(cost_str.split('USD ')[1])
-                if cost_value <= 20:
-                    treatment['cost_level'] = "low"
-                    treatment['cost_icon'] = "💰"
-                elif cost_value <= 50:
-                    treatment['cost_level'] = "medium"
-                    treatment['cost_icon'] = "💰💰"
-                else:
-                    treatment['cost_level'] = "high"
-                    treatment['cost_icon'] = "💰💰💰"
-        
+            else:
+                match = _COST_RE.search(cost_str)
+                if match:
+                    cost_value = float(match.group(1))
+                    level, icon = _COST_LEVELS[bisect.bisect_left(_COST_THRESHOLDS, cost_value)]
+                    treatment['cost_level'] = level
+                    treatment['cost_icon'] = icon
+
         return treatments
@@ -6,11 +6,10 @@ Coordinates image processing, model inference, and result formatting.
 import numpy as np
 from typing import Dict, Any, Tuple, Optional
 import logging
+from .config_loader import load_yaml
 from .image_ingest import ImageValidator
 from .model_loader import ModelLoader
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -23,10 +22,8 @@ class InferenceEngine:
         self.model_loader = ModelLoader(config_path)
         self.config_path = config_path
         
-        # Load configuration
-        import yaml
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        # Load configuration (memoized, shared across engines)
+        self.config = load_yaml(config_path)
     
     def process_image(self, file_content: bytes, filename: str) -> Dict[str, Any]:
         """
@@ -40,17 +37,17 @@ class InferenceEngine:
             Dictionary containing detection results and metadata
         """
         try:
-            # Step 1: Validate image
-            validation_result = self.image_validator.validate_file(file_content, filename)
-            logger.info(f"Image validation passed: {validation_result['width']}x{validation_result['height']}")
-            
-            # Step 2: Preprocess image
-            processed_image = self.image_validator.preprocess_image(file_content)
-            logger.info(f"Image preprocessed to shape: {processed_image.shape}")
+            # Step 1: Validate image (returns the decoded image for reuse)
+            validation_result, image = self.image_validator.validate_and_decode(file_content, filename)
+            logger.info("Image validation passed: %dx%d", validation_result['width'], validation_result['height'])
+
+            # Step 2: Preprocess the already-decoded image
+            processed_image = self.image_validator.preprocess_image(image)
+            logger.info("Image preprocessed to shape: %s", processed_image.shape)
             
             # Step 3: Run inference
             disease_id, disease_name, confidence, heatmap_base64 = self.model_loader.predict(processed_image)
-            logger.info(f"Prediction: {disease_name} (confidence: {confidence:.3f})")
+            logger.info("Prediction: %s (confidence: %.3f)", disease_name, confidence)
             
             # Step 4: Format results
             result = {
@@ -80,7 +77,7 @@ class InferenceEngine:
             return result
             
         except Exception as e:
-            logger.error(f"Inference pipeline failed: {str(e)}")
+            logger.error("Inference pipeline failed: %s", e)
             raise
     
     def get_confidence_level(self, confidence: float) -> str:
@@ -3,29 +3,95 @@ Model loading and management module for the Sustainable Pesticide & Fertilizer R
 Handles model loading, mock mode, and model configuration.
 """
 
+import base64
 import os
-import yaml
+import queue
+import random
+import threading
+import time
 import numpy as np
+from concurrent.futures import Future
 from typing import Optional, Dict, Any, Tuple
 import logging
+from .config_loader import load_yaml
+
+# Heavy optional dependencies, imported once at module load. The model
+# loader falls back to mock mode / no heatmaps when they are missing.
+try:
+    import tensorflow as tf
+except ImportError:
+    tf = None
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Class index -> (disease_id, disease_name), indexed directly by the model's
+# predicted class (this would be configured based on your model)
+_CLASSES = (
+    ("powdery_mildew", "Powdery Mildew"),
+    ("bacterial_spot", "Bacterial Spot"),
+    ("rust", "Rust"),
+    ("healthy", "Healthy"),
+)
+
+# Mock data for demonstration
+_MOCK_RESULTS = (
+    ("powdery_mildew", "Powdery Mildew", 0.92),
+    ("bacterial_spot", "Bacterial Spot", 0.87),
+    ("rust", "Rust Disease", 0.78),
+    ("healthy", "Healthy Plant", 0.95),
+)
+
+# Mock heatmap (base64 encoded 1x1 transparent PNG)
+_MOCK_HEATMAP = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+
+
 class ModelLoader:
     """Handles model loading and mock mode operations."""
     
     def __init__(self, config_path: str = "config.yaml"):
         """Initialize with configuration."""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_yaml(config_path)
         
         self.model_config = self.config['model']
         self.mock_mode = self.model_config['mock_mode']
         self.model = None
-        
+
+        # Optional INT8 TFLite interpreter (model.quantize: int8)
+        self.tflite = None
+        self._tflite_input = None
+        self._tflite_output = None
+
+        # Optional ONNX Runtime session (model.runtime: onnx)
+        self.session = None
+        self._input_name = None
+
+        # Grad-CAM artifacts, built once on first use
+        self._grad_model = None
+        self._grad_fn = None
+
+        # Micro-batching queue, started lazily on first submit()
+        self._batch_queue: Optional[queue.Queue] = None
+        self._batch_thread: Optional[threading.Thread] = None
+        self._batch_lock = threading.Lock()
+
+        # Reusable Grad-CAM scratch buffers (guarded by _gradcam_lock)
+        in_w, in_h = self.model_config['input_size']
+        self._heatmap_f32 = np.empty((in_h, in_w), dtype=np.float32)
+        self._heatmap_u8 = np.empty((in_h, in_w), dtype=np.uint8)
+        self._color_buf = np.empty((in_h, in_w, 3), dtype=np.uint8)
+        self._gradcam_lock = threading.Lock()
+
         if not self.mock_mode:
             self._load_model()
     
@@ -37,18 +103,59 @@ class ModelLoader:
             logger.warning(f"Model file not found at {model_path}. Switching to mock mode.")
             self.mock_mode = True
             return
-        
-        try:
-            import tensorflow as tf
-            self.model = tf.keras.models.load_model(model_path)
-            logger.info(f"Model loaded successfully from {model_path}")
-        except ImportError:
+
+        # ONNX Runtime path: fused graph + tuned CPU kernels, and no Keras
+        # per-call overhead. Expects model.path to point at an exported .onnx.
+        if self.model_config.get('runtime') == 'onnx':
+            if ort is None:
+                logger.warning("onnxruntime not available. Install with: pip install onnxruntime")
+            else:
+                try:
+                    self.session = ort.InferenceSession(
+                        model_path, providers=['CPUExecutionProvider']
+                    )
+                    self._input_name = self.session.get_inputs()[0].name
+                    logger.info(f"ONNX Runtime session ready for {model_path}")
+                    return
+                except Exception as e:
+                    logger.error("ONNX session creation failed: %s. Falling back to Keras.", e)
+                    self.session = None
+
+        if tf is None:
             logger.warning("TensorFlow not available. Install with: pip install tensorflow")
             logger.info("Switching to mock mode.")
             self.mock_mode = True
+            return
+
+        try:
+            self.model = tf.keras.models.load_model(model_path)
+            logger.info(f"Model loaded successfully from {model_path}")
         except Exception as e:
             logger.error(f"Failed to load model: {str(e)}. Switching to mock mode.")
             self.mock_mode = True
+            return
+
+        if self.model_config.get('quantize') == 'int8':
+            self._build_tflite()
+
+    def _build_tflite(self):
+        """Post-training quantize the loaded model into a TFLite interpreter.
+
+        INT8 weights/activations quarter the bytes moved per inference and
+        let TFLite use its int8 dot-product kernels on CPU. The FP32 Keras
+        model is kept as a fallback if conversion fails.
+        """
+        try:
+            converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            self.tflite = tf.lite.Interpreter(model_content=converter.convert())
+            self.tflite.allocate_tensors()
+            self._tflite_input = self.tflite.get_input_details()[0]['index']
+            self._tflite_output = self.tflite.get_output_details()[0]['index']
+            logger.info("Quantized TFLite interpreter ready")
+        except Exception as e:
+            logger.error("TFLite quantization failed: %s. Using FP32 model.", e)
+            self.tflite = None
     
     def predict(self, image_array: np.ndarray) -> Tuple[str, str, float, Optional[str]]:
         """
@@ -67,42 +174,103 @@ class ModelLoader:
     
     def _mock_predict(self) -> Tuple[str, str, float, Optional[str]]:
         """Return mock prediction results for testing/demo."""
-        # Mock data for demonstration
-        mock_results = [
-            ("powdery_mildew", "Powdery Mildew", 0.92),
-            ("bacterial_spot", "Bacterial Spot", 0.87),
-            ("rust", "Rust Disease", 0.78),
-            ("healthy", "Healthy Plant", 0.95)
-        ]
-        
         # Return a random mock result (in real implementation, you might cycle through these)
-        import random
-        disease_id, disease_name, confidence = random.choice(mock_results)
-        
-        # Mock heatmap (base64 encoded 1x1 transparent PNG)
-        mock_heatmap = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
-        
-        return disease_id, disease_name, confidence, mock_heatmap
+        disease_id, disease_name, confidence = _MOCK_RESULTS[random.randrange(len(_MOCK_RESULTS))]
+
+        return disease_id, disease_name, confidence, _MOCK_HEATMAP
     
+    def submit(self, image_array: np.ndarray) -> Future:
+        """
+        Queue an image for micro-batched inference.
+
+        Concurrent submissions within the max_wait_ms window are stacked
+        and run through one model call of up to max_batch images. The
+        returned Future resolves to the same tuple as predict(), except no
+        heatmap is generated on the batched path (explainability stays on
+        the single-image path).
+        """
+        future: Future = Future()
+        if self.mock_mode:
+            future.set_result(self._mock_predict())
+            return future
+
+        self._ensure_batcher()
+        # Copy on enqueue: preprocess_image hands out a reused scratch
+        # buffer, so the caller's next preprocess would overwrite a
+        # queued entry before the batch thread drains it.
+        self._batch_queue.put((np.array(image_array, copy=True), future))
+        return future
+
+    def _ensure_batcher(self) -> None:
+        """Start the micro-batching drain thread on first use."""
+        if self._batch_thread is None:
+            with self._batch_lock:
+                if self._batch_thread is None:
+                    self._batch_queue = queue.Queue()
+                    thread = threading.Thread(target=self._batch_loop, daemon=True)
+                    self._batch_thread = thread
+                    thread.start()
+
+    def _batch_loop(self) -> None:
+        """Drain the queue, stacking inputs into one model call per window."""
+        max_batch = int(self.model_config.get('max_batch', 8))
+        max_wait = float(self.model_config.get('max_wait_ms', 5)) / 1000.0
+
+        while True:
+            batch = [self._batch_queue.get()]
+            deadline = time.monotonic() + max_wait
+            while len(batch) < max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._batch_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            try:
+                images = np.concatenate([item[0] for item in batch], axis=0)
+                # Direct __call__ skips the .predict wrapper overhead
+                predictions = np.asarray(self.model(images, training=False))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), row in zip(batch, predictions):
+                predicted_class, confidence = self._top_prediction(row)
+                disease_id, disease_name = self._class_labels(predicted_class)
+                future.set_result((disease_id, disease_name, confidence, None))
+
+    @staticmethod
+    def _top_prediction(predictions: np.ndarray) -> Tuple[int, float]:
+        """Return (class index, confidence) in one pass over the scores."""
+        flat = np.asarray(predictions).ravel()
+        idx = int(flat.argmax())
+        return idx, float(flat[idx])
+
+    @staticmethod
+    def _class_labels(predicted_class: int) -> Tuple[str, str]:
+        """Map a class index to (disease_id, disease_name)."""
+        if 0 <= predicted_class < len(_CLASSES):
+            return _CLASSES[predicted_class]
+        return "unknown", "Unknown"
+
     def _real_predict(self, image_array: np.ndarray) -> Tuple[str, str, float, Optional[str]]:
         """Run actual model inference."""
         try:
-            # Run prediction
-            predictions = self.model.predict(image_array, verbose=0)
-            confidence = float(np.max(predictions))
-            predicted_class = int(np.argmax(predictions))
-            
-            # Map class index to disease ID (this would be configured based on your model)
-            class_mapping = {
-                0: "powdery_mildew",
-                1: "bacterial_spot", 
-                2: "rust",
-                3: "healthy"
-            }
-            
-            disease_id = class_mapping.get(predicted_class, "unknown")
-            disease_name = disease_id.replace("_", " ").title()
-            
+            # Run prediction (direct __call__ skips the .predict wrapper)
+            if self.session is not None:
+                predictions = self.session.run(None, {self._input_name: image_array})[0]
+            elif self.tflite is not None:
+                self.tflite.set_tensor(self._tflite_input, image_array)
+                self.tflite.invoke()
+                predictions = self.tflite.get_tensor(self._tflite_output)
+            else:
+                predictions = np.asarray(self.model(image_array, training=False))
+            predicted_class, confidence = self._top_prediction(predictions)
+            disease_id, disease_name = self._class_labels(predicted_class)
+
             # Generate Grad-CAM heatmap
             heatmap_base64 = self._generate_gradcam(image_array, predicted_class)
             
@@ -112,65 +280,84 @@ class ModelLoader:
             logger.error(f"Prediction failed: {str(e)}")
             return "unknown", "Unknown", 0.0, None
     
-    def _generate_gradcam(self, image_array: np.ndarray, predicted_class: int) -> Optional[str]:
-        """Generate Grad-CAM heatmap for explainability."""
-        try:
-            import tensorflow as tf
-            import cv2
-            import base64
-            from io import BytesIO
-            
-            # Get the last convolutional layer
-            last_conv_layer = None
-            for layer in reversed(self.model.layers):
-                if len(layer.output_shape) == 4:  # Convolutional layer
-                    last_conv_layer = layer
-                    break
-            
-            if last_conv_layer is None:
-                return None
-            
-            # Create a model that outputs the last conv layer and final predictions
-            grad_model = tf.keras.models.Model(
-                inputs=self.model.inputs,
-                outputs=[last_conv_layer.output, self.model.output]
-            )
-            
+    def _ensure_grad_model(self) -> bool:
+        """Build and cache the Grad-CAM model/compiled gradient fn once."""
+        if self._grad_fn is not None:
+            return True
+
+        # Get the last convolutional layer
+        last_conv_layer = None
+        for layer in reversed(self.model.layers):
+            if len(layer.output_shape) == 4:  # Convolutional layer
+                last_conv_layer = layer
+                break
+
+        if last_conv_layer is None:
+            return False
+
+        # Create a model that outputs the last conv layer and final predictions
+        grad_model = tf.keras.models.Model(
+            inputs=self.model.inputs,
+            outputs=[last_conv_layer.output, self.model.output]
+        )
+
+        @tf.function
+        def _grad_heatmap(image, class_idx):
             # Compute gradients
             with tf.GradientTape() as tape:
-                conv_outputs, predictions = grad_model(image_array)
-                class_output = predictions[:, predicted_class]
-            
+                conv_outputs, predictions = grad_model(image)
+                class_output = predictions[:, class_idx]
+
             grads = tape.gradient(class_output, conv_outputs)
-            
+
             # Global average pooling of gradients
             pooled_grads = tf.reduce_mean(grads, axis=(0, 1, 2))
-            
+
             # Multiply each channel in the feature map array by its importance
-            conv_outputs = conv_outputs[0]
-            heatmap = conv_outputs @ pooled_grads[..., tf.newaxis]
+            heatmap = conv_outputs[0] @ pooled_grads[..., tf.newaxis]
             heatmap = tf.squeeze(heatmap)
-            
+
             # Normalize heatmap
-            heatmap = tf.maximum(heatmap, 0) / tf.math.reduce_max(heatmap)
-            heatmap = heatmap.numpy()
-            
-            # Resize heatmap to original image size
-            heatmap = cv2.resize(heatmap, (224, 224))
-            heatmap = np.uint8(255 * heatmap)
-            
-            # Apply colormap
-            heatmap = cv2.applyColorMap(heatmap, cv2.COLORMAP_JET)
-            
-            # Convert to base64
-            _, buffer = cv2.imencode('.png', heatmap)
+            return tf.maximum(heatmap, 0) / tf.math.reduce_max(heatmap)
+
+        self._grad_model = grad_model
+        self._grad_fn = _grad_heatmap
+        return True
+
+    def _generate_gradcam(self, image_array: np.ndarray, predicted_class: int) -> Optional[str]:
+        """Generate Grad-CAM heatmap for explainability (base64-encoded JPEG)."""
+        if cv2 is None:
+            logger.warning("OpenCV not available. Install with: pip install opencv-python")
+            return None
+
+        try:
+            if not self._ensure_grad_model():
+                return None
+
+            heatmap = self._grad_fn(image_array, tf.constant(predicted_class)).numpy()
+
+            with self._gradcam_lock:
+                # Resize and colorize into preallocated scratch buffers
+                h, w = self._heatmap_u8.shape
+                cv2.resize(heatmap, (w, h), dst=self._heatmap_f32,
+                           interpolation=cv2.INTER_LINEAR)
+                # Scale and cast to uint8 in one fused pass over the buffer
+                np.multiply(self._heatmap_f32, 255, out=self._heatmap_u8,
+                            casting='unsafe')
+
+                # Apply colormap
+                cv2.applyColorMap(self._heatmap_u8, cv2.COLORMAP_JET, dst=self._color_buf)
+
+                # Convert to base64. JPEG: a smooth colormap compresses far
+                # smaller and faster than PNG's DEFLATE.
+                _, buffer = cv2.imencode(
+                    '.jpg', self._color_buf, [int(cv2.IMWRITE_JPEG_QUALITY), 80]
+                )
+
             heatmap_base64 = base64.b64encode(buffer).decode('utf-8')
-            
+
             return heatmap_base64
             
-        except ImportError:
-            logger.warning("OpenCV not available. Install with: pip install opencv-python")
-            return None
         except Exception as e:
             logger.error(f"Grad-CAM generation failed: {str(e)}")
             return None
@@ -183,7 +370,7 @@ class ModelLoader:
         """Get model information and status."""
         return {
             "mock_mode": self.mock_mode,
-            "model_loaded": self.model is not None,
+            "model_loaded": self.model is not None or self.session is not None,
             "model_path": self.model_config['path'],
             "input_size": self.model_config['input_size'],
             "confidence_threshold": self.model_config['confidence_threshold']
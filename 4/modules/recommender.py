@@ -3,19 +3,44 @@ Recommendation engine module for the Sustainable Pesticide & Fertilizer Recommen
 Implements rules-driven treatment recommendations with anti-overuse logic and SDG alignment.
 """
 
-import yaml
 import logging
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
+from .config_loader import load_yaml
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class TreatmentRemedy:
-    """Data class for treatment remedy information."""
+@lru_cache(maxsize=512)
+def _summary_cached(
+    disease_name: str,
+    organic_sig: Optional[Tuple[str, str]],
+    chemical_sig: Optional[Tuple[str, str, str, Any]],
+) -> str:
+    """Build the human summary once per (disease, top-remedy) signature."""
+    summary_parts = [f"Detected: {disease_name}"]
+
+    if organic_sig:
+        name, dosage = organic_sig
+        summary_parts.append(f"Try: {name} ({dosage})")
+
+    if chemical_sig:
+        name, dosage, ppe_list, phi = chemical_sig
+        summary_parts.append(
+            f"If needed: {name} ({dosage}) "
+            f"— wear {ppe_list} — wait {phi} days before harvest"
+        )
+
+    return " | ".join(summary_parts)
+
+
+class TreatmentRemedy(NamedTuple):
+    """Treatment remedy information.
+
+    A NamedTuple keeps instances immutable and __dict__-free (one of
+    these is built per remedy per disease at init) while staying on the
+    package's Python 3.8 floor, which dataclass slots= would break.
+    """
     type: str  # "organic" or "chemical"
     name: str
     application: str
@@ -34,16 +59,70 @@ class RecommendationEngine:
     
     def __init__(self, diseases_path: str = "diseases.yml", config_path: str = "config.yaml"):
         """Initialize the recommendation engine."""
-        # Load diseases database
-        with open(diseases_path, 'r') as f:
-            self.diseases_db = yaml.safe_load(f)
-        
-        # Load configuration
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        # Load diseases database (memoized, shared across engines)
+        self.diseases_db = load_yaml(diseases_path)
+
+        # Load configuration (memoized, shared across engines)
+        self.config = load_yaml(config_path)
         
         self.anti_overuse_config = self.config['anti_overuse']
         self.sdg_alignment = self.config['sdg_alignment']
+
+        # Hot-path constants, hoisted out of the per-call dict lookups
+        self._low_conf = float(self.config['model']['low_confidence_threshold'])
+        self._max_mult = float(self.anti_overuse_config['max_dosage_multiplier'])
+        self._confirm_above = float(self.anti_overuse_config['require_confirmation_above'])
+
+        # diseases_db is read-mostly: format every remedy once here and
+        # partition by type, so per-request work is lookups plus the
+        # decision rules. The cached dicts never leave the engine:
+        # public methods return per-treatment copies, since callers
+        # (e.g. add_visual_indicators) mutate treatments in place.
+        self._partitioned: Dict[str, Tuple[List[Dict], List[Dict]]] = {}
+        self._formatted_remedies: Dict[str, List[Dict[str, Any]]] = {}
+        for disease_id, info in self.diseases_db.items():
+            formatted = [
+                self._format_remedy(TreatmentRemedy(**r))
+                for r in info.get('remedies', [])
+            ]
+            self._formatted_remedies[disease_id] = formatted
+            # Chemical entries carry their evidence score pre-cast so the
+            # confidence compare in the decision rules is purely numeric,
+            # plus a prebuilt requires_confirmation variant so the
+            # low-confidence branch allocates nothing per call.
+            self._partitioned[disease_id] = (
+                [r for r in formatted if r['type'] == 'organic'],
+                [(float(r.get('evidence_score', 0.5)), r,
+                  {**r, 'requires_confirmation': True})
+                 for r in formatted if r['type'] == 'chemical'],
+            )
+
+        # Name index for validate_dosage: O(1) remedy lookup per query
+        self._remedy_index: Dict[str, Dict[str, Dict]] = {
+            disease_id: {r['name']: r for r in info.get('remedies', [])}
+            for disease_id, info in self.diseases_db.items()
+        }
+
+        # Memo of decision-rule output keyed by (disease_id, confidence).
+        # The same detection repeated across images (and across tests)
+        # hits this instead of re-filtering; entries are copied
+        # dict-by-dict on the way out so callers can mutate freely.
+        self._rules_cache: Dict[Tuple[str, float], List[Dict]] = {}
+
+        # Unknown-disease response template, shallow-copied per miss.
+        # Nested values are shared and treated as read-only by callers.
+        self._unknown_tpl: Dict[str, Any] = {
+            "disease": {
+                "id": "unknown",
+                "name": "Unknown Disease",
+                "confidence": 0.0
+            },
+            "recommended_treatments": [],
+            "sdg_alignment": self.sdg_alignment,
+            "notes": "Unknown disease detected. Please consult with a local agricultural expert.",
+            "uncertainty_warning": "Disease not recognized. Manual inspection recommended.",
+            "metadata": {}
+        }
     
     def get_recommendations(
         self, 
@@ -74,16 +153,11 @@ class RecommendationEngine:
             return self._get_unknown_disease_response()
         
         disease_info = self.diseases_db[disease_id]
-        remedies = disease_info.get('remedies', [])
-        
-        # Apply decision rules
-        filtered_remedies = self._apply_decision_rules(remedies, confidence, disease_id)
-        
-        # Format recommendations
-        recommendations = []
-        for remedy_data in filtered_remedies:
-            remedy = TreatmentRemedy(**remedy_data)
-            recommendations.append(self._format_remedy(remedy))
+
+        # Apply decision rules over the preformatted remedies (memoized);
+        # copy each treatment so callers can mutate without poisoning
+        # the cache (the formatter adds visual-indicator keys in place)
+        recommendations = [dict(r) for r in self._cached_decision_rules(disease_id, confidence)]
         
         # Generate human summary
         human_summary = self._generate_human_summary(disease_info['name'], recommendations, farmer_language)
@@ -108,53 +182,99 @@ class RecommendationEngine:
             }
         }
     
+    def get_recommendations_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Generate recommendations for many detections in one call.
+
+        Decision-rule output is computed once per distinct
+        (disease_id, confidence) pair via the engine-level memo and
+        copied per request; per-request metadata is stamped on
+        individually.
+
+        Args:
+            requests: List of dicts with disease_id, confidence and the
+                optional crop_type/growth_stage/location/farmer_language
+                keys accepted by get_recommendations
+
+        Returns:
+            List of recommendation dictionaries, one per request, in order
+        """
+        results = []
+        for request in requests:
+            disease_id = request['disease_id']
+            confidence = request['confidence']
+
+            if disease_id not in self.diseases_db:
+                logger.warning(f"Unknown disease ID: {disease_id}")
+                results.append(self._get_unknown_disease_response())
+                continue
+
+            disease_info = self.diseases_db[disease_id]
+            recommendations = self._cached_decision_rules(disease_id, confidence)
+
+            farmer_language = request.get('farmer_language', 'en')
+            results.append({
+                "disease": {
+                    "id": disease_id,
+                    "name": disease_info['name'],
+                    "confidence": confidence
+                },
+                "recommended_treatments": [dict(r) for r in recommendations],
+                "notes": self._generate_human_summary(
+                    disease_info['name'], recommendations, farmer_language
+                ),
+                "uncertainty_warning": self._get_uncertainty_message(confidence, disease_id),
+                "metadata": {
+                    "crop_type": request.get('crop_type'),
+                    "growth_stage": request.get('growth_stage'),
+                    "location": request.get('location'),
+                    "language": farmer_language
+                }
+            })
+
+        return results
+
+    def _cached_decision_rules(self, disease_id: str, confidence: float) -> List[Dict]:
+        """Memoized decision-rule output; callers must not mutate the list."""
+        key = (disease_id, confidence)
+        recommendations = self._rules_cache.get(key)
+        if recommendations is None:
+            if len(self._rules_cache) >= 512:
+                self._rules_cache.clear()
+            recommendations = self._apply_decision_rules(confidence, disease_id)
+            self._rules_cache[key] = recommendations
+        return recommendations
+
     def _apply_decision_rules(
         self, 
-        remedies: List[Dict], 
         confidence: float, 
         disease_id: str
     ) -> List[Dict]:
         """Apply decision rules to filter and prioritize remedies."""
-        filtered_remedies = []
-        
-        # Rule 1: Default - present organic remedies first
-        organic_remedies = [r for r in remedies if r['type'] == 'organic']
-        chemical_remedies = [r for r in remedies if r['type'] == 'chemical']
+        # Rule 1: Default - present organic remedies first (partitioned at init)
+        organic_remedies, chemical_remedies = self._partitioned.get(disease_id, ((), ()))
         
         # Always include organic remedies
-        filtered_remedies.extend(organic_remedies)
+        filtered_remedies = list(organic_remedies)
         
         # Rule 2: Chemical remedies based on confidence and evidence
-        low_confidence_threshold = self.config['model']['low_confidence_threshold']
-        
-        if confidence >= low_confidence_threshold:
+        if confidence >= self._low_conf:
             # Include chemical remedies if confidence is sufficient
-            for remedy in chemical_remedies:
-                if confidence >= remedy.get('evidence_score', 0.5):
+            for evidence_score, remedy, _ in chemical_remedies:
+                if confidence >= evidence_score:
                     filtered_remedies.append(remedy)
         else:
-            # Low confidence - mark chemical remedies as requiring confirmation
-            for remedy in chemical_remedies:
-                remedy_copy = remedy.copy()
-                remedy_copy['requires_confirmation'] = True
-                filtered_remedies.append(remedy_copy)
+            # Low confidence - use the prebuilt requires_confirmation variants
+            for _, _, confirm_variant in chemical_remedies:
+                filtered_remedies.append(confirm_variant)
         
         return filtered_remedies
     
     def _format_remedy(self, remedy: TreatmentRemedy) -> Dict[str, Any]:
-        """Format a remedy for API response."""
+        """Format a remedy for API response (application is exposed as dosage)."""
         return {
-            "type": remedy.type,
-            "name": remedy.name,
-            "dosage": remedy.application,
-            "application_volume": remedy.application_volume,
-            "frequency": remedy.frequency,
-            "best_time": remedy.best_time,
-            "cost_estimate_per_hectare": remedy.cost_estimate_per_hectare,
-            "safety": remedy.safety,
-            "evidence_score": remedy.evidence_score,
-            "max_applications_per_season": remedy.max_applications_per_season,
-            "requires_confirmation": remedy.requires_confirmation
+            "dosage" if field == "application" else field: value
+            for field, value in remedy._asdict().items()
         }
     
     def _generate_human_summary(
@@ -163,40 +283,36 @@ class RecommendationEngine:
         recommendations: List[Dict], 
         language: str
     ) -> str:
-        """Generate a human-friendly summary of recommendations."""
+        """Generate a human-friendly summary of recommendations.
+
+        The string depends only on the disease name and the top remedy of
+        each type, so it is built once per signature and memoized — the
+        dominant runtime case repeats the same disease across images.
+        """
         if not recommendations:
             return f"No specific treatment needed for {disease_name}."
         
-        # Get top organic recommendation
-        organic_recs = [r for r in recommendations if r['type'] == 'organic']
-        chemical_recs = [r for r in recommendations if r['type'] == 'chemical']
-        
-        summary_parts = [f"Detected: {disease_name}"]
-        
-        if organic_recs:
-            top_organic = organic_recs[0]
-            summary_parts.append(f"Try: {top_organic['name']} ({top_organic['dosage']})")
+        # Get top organic/chemical recommendation; stop at the first of
+        # each instead of materializing filtered lists
+        top_organic = next((r for r in recommendations if r['type'] == 'organic'), None)
+        top_chemical = next((r for r in recommendations if r['type'] == 'chemical'), None)
         
-        if chemical_recs:
-            top_chemical = chemical_recs[0]
-            ppe_list = ", ".join(top_chemical['safety'].get('PPE', []))
-            phi = top_chemical['safety'].get('pre_harvest_interval', '0')
-            
-            summary_parts.append(
-                f"If needed: {top_chemical['name']} ({top_chemical['dosage']}) "
-                f"— wear {ppe_list} — wait {phi} days before harvest"
-            )
+        organic_sig = (top_organic['name'], top_organic['dosage']) if top_organic else None
+        chemical_sig = (
+            top_chemical['name'],
+            top_chemical['dosage'],
+            ", ".join(top_chemical['safety'].get('PPE', [])),
+            top_chemical['safety'].get('pre_harvest_interval', '0'),
+        ) if top_chemical else None
         
-        return " | ".join(summary_parts)
+        return _summary_cached(disease_name, organic_sig, chemical_sig)
     
     def _get_uncertainty_message(self, confidence: float, disease_id: str) -> Optional[str]:
         """Generate uncertainty message for low-confidence predictions."""
         if disease_id == "healthy":
             return None
         
-        low_threshold = self.config['model']['low_confidence_threshold']
-        
-        if confidence < low_threshold:
+        if confidence < self._low_conf:
             return (
                 f"Low confidence detection ({confidence:.1%}). "
                 "Consider additional scouting or confirmatory tests before treatment."
@@ -206,18 +322,9 @@ class RecommendationEngine:
     
     def _get_unknown_disease_response(self) -> Dict[str, Any]:
         """Handle unknown disease cases."""
-        return {
-            "disease": {
-                "id": "unknown",
-                "name": "Unknown Disease",
-                "confidence": 0.0
-            },
-            "recommended_treatments": [],
-            "sdg_alignment": self.sdg_alignment,
-            "notes": "Unknown disease detected. Please consult with a local agricultural expert.",
-            "uncertainty_warning": "Disease not recognized. Manual inspection recommended.",
-            "metadata": {}
-        }
+        response = self._unknown_tpl.copy()
+        response["metadata"] = {}
+        return response
     
     def validate_dosage(
         self, 
@@ -243,13 +350,8 @@ class RecommendationEngine:
                 "blocked": True
             }
         
-        # Find the specific remedy
-        remedies = self.diseases_db[disease_id].get('remedies', [])
-        remedy = None
-        for r in remedies:
-            if r['name'] == remedy_name:
-                remedy = r
-                break
+        # Find the specific remedy via the prebuilt name index
+        remedy = self._remedy_index.get(disease_id, {}).get(remedy_name)
         
         if not remedy:
             return {
@@ -260,8 +362,8 @@ class RecommendationEngine:
         
         # Parse requested dosage (simplified - in real implementation, you'd parse the string)
         # For now, we'll use a simple multiplier check
-        max_multiplier = self.anti_overuse_config['max_dosage_multiplier']
-        confirmation_threshold = self.anti_overuse_config['require_confirmation_above']
+        max_multiplier = self._max_mult
+        confirmation_threshold = self._confirm_above
         
         # Mock dosage validation (in real implementation, parse and compare actual values)
         dosage_multiplier = 1.0  # This would be calculated from requested_dosage
@@ -293,17 +395,11 @@ class RecommendationEngine:
             return None
         
         disease_info = self.diseases_db[disease_id]
-        remedies = disease_info.get('remedies', [])
-        
-        formatted_remedies = []
-        for remedy_data in remedies:
-            remedy = TreatmentRemedy(**remedy_data)
-            formatted_remedies.append(self._format_remedy(remedy))
         
         return {
             "disease": {
                 "id": disease_id,
                 "name": disease_info['name']
             },
-            "remedies": formatted_remedies
+            "remedies": [dict(r) for r in self._formatted_remedies[disease_id]]
         }
@@ -3,55 +3,37 @@
 Test script to check which modules are missing
 """
 
+import importlib.util
+
+# (importable name, pip/display name) pairs checked in order
+_REQUIRED_MODULES = [
+    ("yaml", "yaml"),
+    ("logging", "logging"),
+    ("click", "click"),
+    ("PIL", "PIL (Pillow)"),
+    ("numpy", "numpy"),
+    ("modules.cli", "modules.cli"),
+]
+
+
 def test_imports():
     """Test all required imports"""
     missing_modules = []
-    
-    # Test standard library imports
-    try:
-        import yaml
-        print("✓ yaml: OK")
-    except ImportError as e:
-        missing_modules.append("yaml")
-        print(f"✗ yaml: MISSING - {e}")
-    
-    try:
-        import logging
-        print("✓ logging: OK")
-    except ImportError as e:
-        missing_modules.append("logging")
-        print(f"✗ logging: MISSING - {e}")
-    
-    # Test third-party imports
-    try:
-        import click
-        print("✓ click: OK")
-    except ImportError as e:
-        missing_modules.append("click")
-        print(f"✗ click: MISSING - {e}")
-    
-    try:
-        import PIL
-        print("✓ PIL (Pillow): OK")
-    except ImportError as e:
-        missing_modules.append("pillow")
-        print(f"✗ PIL (Pillow): MISSING - {e}")
-    
-    try:
-        import numpy
-        print("✓ numpy: OK")
-    except ImportError as e:
-        missing_modules.append("numpy")
-        print(f"✗ numpy: MISSING - {e}")
-    
-    # Test local module imports
-    try:
-        from modules.cli import PlantCareCLI
-        print("✓ modules.cli: OK")
-    except ImportError as e:
-        missing_modules.append("modules.cli")
-        print(f"✗ modules.cli: MISSING - {e}")
-    
+
+    # find_spec resolves each module without executing it, so probing
+    # doesn't pay the full import cost of numpy/PIL/click
+    for module_name, display_name in _REQUIRED_MODULES:
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ModuleNotFoundError):
+            spec = None
+
+        if spec is not None:
+            print(f"✓ {display_name}: OK")
+        else:
+            missing_modules.append("pillow" if module_name == "PIL" else module_name)
+            print(f"✗ {display_name}: MISSING")
+
     # Summary
     if missing_modules:
         print(f"\n❌ Missing modules: {', '.join(missing_modules)}")
@@ -59,7 +41,7 @@ def test_imports():
         print("pip install --user pyyaml click pillow numpy python-dotenv")
     else:
         print("\n✅ All modules are available!")
-    
+
     return missing_modules
 
 if __name__ == "__main__":
@@ -0,0 +1,126 @@
+"""
+Shared session-scoped fixtures for the test suite.
+
+Engine construction parses the YAML configs and initializes the model
+loader; building each engine once per session instead of once per test
+amortizes that cost across the whole suite. The engines are stateless
+between calls, so sharing is safe.
+"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+try:
+    import fastjsonschema
+except ImportError:  # fall back to plain key checks
+    fastjsonschema = None
+
+from modules.cli import PlantCareCLI
+from modules.formatter import ResponseFormatter
+from modules.inference import InferenceEngine
+from modules.recommender import RecommendationEngine
+
+
+def pytest_report_header(config):
+    """Surface which Pillow build is active.
+
+    pillow-simd (built against libjpeg-turbo) is a drop-in speedup for
+    the JPEG encode/decode these tests lean on; its versions carry a
+    .postN suffix, so the header makes it obvious whether CI got the
+    SIMD build or vanilla Pillow.
+    """
+    import PIL
+
+    build = "SIMD" if "post" in PIL.__version__ else "vanilla"
+    return f"Pillow: {PIL.__version__} ({build} build)"
+
+
+@pytest.fixture(scope="session")
+def inference_engine():
+    """Create inference engine shared across the session."""
+    return InferenceEngine("config.yaml")
+
+
+@pytest.fixture(scope="session")
+def recommendation_engine():
+    """Create recommendation engine shared across the session."""
+    return RecommendationEngine("diseases.yml", "config.yaml")
+
+
+@pytest.fixture(scope="session")
+def engine(recommendation_engine):
+    """Alias used by the recommendation-engine unit tests."""
+    return recommendation_engine
+
+
+@pytest.fixture(scope="session")
+def formatter():
+    """Create formatter shared across the session."""
+    return ResponseFormatter("config.yaml")
+
+
+@pytest.fixture(scope="session")
+def cli_instance():
+    """Create CLI instance shared across the session."""
+    return PlantCareCLI("config.yaml")
+
+
+@pytest.fixture(scope="session")
+def test_image_bytes():
+    """Read the pre-encoded 300x300 green test JPEG.
+
+    The file was generated once with
+    Image.new('RGB', (300, 300), color='green').save(..., format='JPEG')
+    and committed, so the suite pays a page-cached read instead of a
+    PIL encode.
+    """
+    return (Path(__file__).parent / "data" / "green_300x300.jpg").read_bytes()
+
+
+@pytest.fixture(scope="session")
+def test_image_path(tmp_path_factory):
+    """Copy the pre-encoded test JPEG to a temp file once per session."""
+    src = Path(__file__).parent / "data" / "green_300x300.jpg"
+    dst = tmp_path_factory.mktemp("images") / "test_image.jpg"
+    shutil.copy(src, dst)
+    return str(dst)
+
+
+def _make_validator(required):
+    """Compile a required-keys validator.
+
+    fastjsonschema code-generates the check at compile time; without it
+    the fallback asserts the same key set in Python.
+    """
+    if fastjsonschema is not None:
+        return fastjsonschema.compile({"type": "object", "required": list(required)})
+
+    def _validate(obj):
+        missing = [key for key in required if key not in obj]
+        assert not missing, f"missing keys: {missing}"
+        return obj
+
+    return _validate
+
+
+@pytest.fixture(scope="session")
+def validate_inference_result():
+    """Schema check for InferenceEngine.process_image output."""
+    return _make_validator(("disease", "image_metadata", "model_info"))
+
+
+@pytest.fixture(scope="session")
+def validate_recommendations():
+    """Schema check for RecommendationEngine.get_recommendations output."""
+    return _make_validator(("disease", "recommended_treatments", "sdg_alignment", "notes"))
+
+
+@pytest.fixture(scope="session")
+def validate_response():
+    """Schema check for the fully formatted detection response."""
+    return _make_validator((
+        "disease", "recommended_treatments", "sdg_alignment", "notes",
+        "supporting_heatmap_base64", "metadata",
+    ))
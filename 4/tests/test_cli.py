@@ -6,26 +6,12 @@ import pytest
 import io
 import tempfile
 from pathlib import Path
-from PIL import Image
 from modules.cli import PlantCareCLI
 
 
 class TestPlantCareCLI:
     """Test cases for PlantCareCLI class."""
     
-    @pytest.fixture
-    def cli_instance(self):
-        """Create CLI instance for testing."""
-        return PlantCareCLI("config.yaml")
-    
-    @pytest.fixture
-    def test_image_path(self, tmp_path):
-        """Create a temporary image file for testing."""
-        img = Image.new('RGB', (300, 300), color='green')
-        image_path = tmp_path / "test_image.jpg"
-        img.save(image_path, format='JPEG')
-        return str(image_path)
-    
     def test_cli_initialization(self, cli_instance):
         """Test CLI initialization."""
         assert cli_instance is not None
@@ -204,51 +190,44 @@ class TestPlantCareCLI:
         assert isinstance(result, str)
         assert "Error: Test error" in result
     
-    def test_multilingual_support(self, cli_instance, test_image_path):
+    @pytest.mark.parametrize("language", ["en", "es", "fr", "hi", "pt"])
+    def test_multilingual_support(self, cli_instance, test_image_path, language):
         """Test multilingual support in CLI."""
-        languages = ["en", "es", "fr", "hi", "pt"]
-        
-        for language in languages:
-            result = cli_instance.analyze_image(
-                image_path=test_image_path,
-                language=language
-            )
-            
-            # Should not have error
-            assert "error" not in result or not result["error"]
-            
-            # Check metadata language
-            if "metadata" in result:
-                assert result["metadata"]["language"] == language
-    
-    def test_optional_parameters(self, cli_instance, test_image_path):
-        """Test CLI with optional parameters."""
-        # Test with all parameters
-        result_all = cli_instance.analyze_image(
+        result = cli_instance.analyze_image(
             image_path=test_image_path,
-            crop_type="Rice",
-            growth_stage="vegetative",
-            location="India",
-            language="hi"
+            language=language
         )
         
-        assert "metadata" in result_all
-        assert result_all["metadata"]["crop_type"] == "Rice"
-        assert result_all["metadata"]["growth_stage"] == "vegetative"
-        assert result_all["metadata"]["location"] == "India"
-        assert result_all["metadata"]["language"] == "hi"
-        
-        # Test with minimal parameters
-        result_minimal = cli_instance.analyze_image(
-            image_path=test_image_path,
-            language="en"
-        )
+        # Should not have error
+        assert "error" not in result or not result["error"]
+        
+        # Check metadata language
+        if "metadata" in result:
+            assert result["metadata"]["language"] == language
+    
+    @pytest.mark.parametrize("extra_params,expected_metadata", [
+        pytest.param(
+            {"crop_type": "Rice", "growth_stage": "vegetative",
+             "location": "India", "language": "hi"},
+            {"crop_type": "Rice", "growth_stage": "vegetative",
+             "location": "India", "language": "hi"},
+            id="all",
+        ),
+        pytest.param(
+            {"language": "en"},
+            {"crop_type": None, "growth_stage": None,
+             "location": None, "language": "en"},
+            id="minimal",
+        ),
+    ])
+    def test_optional_parameters(self, cli_instance, test_image_path,
+                                 extra_params, expected_metadata):
+        """Test CLI with optional parameters."""
+        result = cli_instance.analyze_image(image_path=test_image_path, **extra_params)
         
-        assert "metadata" in result_minimal
-        assert result_minimal["metadata"]["crop_type"] is None
-        assert result_minimal["metadata"]["growth_stage"] is None
-        assert result_minimal["metadata"]["location"] is None
-        assert result_minimal["metadata"]["language"] == "en"
+        assert "metadata" in result
+        for key, expected in expected_metadata.items():
+            assert result["metadata"][key] == expected
     
     def test_visual_indicators(self, cli_instance, test_image_path):
         """Test that visual indicators are added to treatments."""
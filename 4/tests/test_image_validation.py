@@ -4,6 +4,8 @@ Unit tests for image validation and preprocessing module.
 
 import pytest
 import io
+from pathlib import Path
+
 import numpy as np
 from PIL import Image
 from modules.image_ingest import ImageValidator, ValidationError
@@ -12,38 +14,50 @@ from modules.image_ingest import ImageValidator, ValidationError
 class TestImageValidator:
     """Test cases for ImageValidator class."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def validator(self):
-        """Create ImageValidator instance for testing."""
+        """Create ImageValidator instance once per module."""
         return ImageValidator("config.yaml")
     
-    @pytest.fixture
-    def valid_image_bytes(self):
-        """Create valid image bytes for testing."""
-        # Create a 300x300 RGB image
-        img = Image.new('RGB', (300, 300), color='green')
+    @staticmethod
+    def _encode(img, fmt='JPEG'):
+        """Encode a PIL image to bytes once; fixtures cache the result."""
         img_bytes = io.BytesIO()
-        img.save(img_bytes, format='JPEG')
+        img.save(img_bytes, format=fmt)
         return img_bytes.getvalue()
+
+    @pytest.fixture(scope="module")
+    def valid_image_bytes(self):
+        """Read the pre-encoded 300x300 JPEG instead of re-encoding it."""
+        return (Path(__file__).parent / "data" / "green_300x300.jpg").read_bytes()
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def small_image_bytes(self):
         """Create small image bytes for testing."""
         # Create a 100x100 RGB image (below minimum size)
-        img = Image.new('RGB', (100, 100), color='red')
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format='JPEG')
-        return img_bytes.getvalue()
+        return self._encode(Image.new('RGB', (100, 100), color='red'))
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def large_image_bytes(self):
         """Create large image bytes for testing."""
         # Create a large image (simulate > 8MB)
         # For testing, we'll create a smaller image but mock the size check
-        img = Image.new('RGB', (500, 500), color='blue')
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format='JPEG')
-        return img_bytes.getvalue()
+        return self._encode(Image.new('RGB', (500, 500), color='blue'))
+
+    @pytest.fixture(scope="module")
+    def wide_image_bytes(self):
+        """Very wide image for the aspect-ratio warning test."""
+        return self._encode(Image.new('RGB', (1000, 100), color='yellow'))
+
+    @pytest.fixture(scope="module")
+    def grayscale_image_bytes(self):
+        """Grayscale image for the RGB-conversion test."""
+        return self._encode(Image.new('L', (300, 300), color=128))
+
+    @pytest.fixture(scope="module")
+    def png_image_bytes(self):
+        """PNG-encoded image for the PNG-processing test."""
+        return self._encode(Image.new('RGB', (300, 300), color='purple'), fmt='PNG')
     
     def test_valid_image_validation(self, validator, valid_image_bytes):
         """Test validation of a valid image."""
@@ -71,14 +85,9 @@ class TestImageValidator:
         assert exc_info.value.status_code == 400
         assert "Image too small" in exc_info.value.detail
     
-    def test_extreme_aspect_ratio_warning(self, validator):
+    def test_extreme_aspect_ratio_warning(self, validator, wide_image_bytes):
         """Test warning for extreme aspect ratio."""
-        # Create a very wide image
-        img = Image.new('RGB', (1000, 100), color='yellow')
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format='JPEG')
-        
-        result = validator.validate_file(img_bytes.getvalue(), "wide.jpg")
+        result = validator.validate_file(wide_image_bytes, "wide.jpg")
         
         assert result['valid'] is True
         assert result['warning'] is not None
@@ -109,27 +118,17 @@ class TestImageValidator:
         assert processed.min() >= 0.0
         assert processed.max() <= 1.0
     
-    def test_rgb_conversion(self, validator):
+    def test_rgb_conversion(self, validator, grayscale_image_bytes):
         """Test conversion of non-RGB images to RGB."""
-        # Create a grayscale image
-        img = Image.new('L', (300, 300), color=128)
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format='JPEG')
-        
-        processed = validator.preprocess_image(img_bytes.getvalue())
+        processed = validator.preprocess_image(grayscale_image_bytes)
         
         # Should still be RGB after conversion
         assert processed.shape == (1, 224, 224, 3)
     
-    def test_png_image_processing(self, validator):
+    def test_png_image_processing(self, validator, png_image_bytes):
         """Test processing of PNG images."""
-        # Create a PNG image
-        img = Image.new('RGB', (300, 300), color='purple')
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format='PNG')
-        
-        result = validator.validate_file(img_bytes.getvalue(), "test.png")
-        processed = validator.preprocess_image(img_bytes.getvalue())
+        result = validator.validate_file(png_image_bytes, "test.png")
+        processed = validator.preprocess_image(png_image_bytes)
         
         assert result['valid'] is True
         assert result['format'] == 'png'
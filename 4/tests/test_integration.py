@@ -4,210 +4,160 @@ Integration tests for the complete system workflow.
 
 import pytest
 import io
-import yaml
 from PIL import Image
+from modules.config_loader import load_yaml
 from modules.inference import InferenceEngine
 from modules.recommender import RecommendationEngine
 from modules.formatter import ResponseFormatter
 from modules.cli import PlantCareCLI
 
 
+# Required config keys, checked via C-level frozenset subset ops instead
+# of one assert per key in the nested validation loop
+REQUIRED_DISEASE_KEYS = frozenset({"name", "remedies"})
+REQUIRED_REMEDY_KEYS = frozenset({
+    "type", "name", "application", "safety",
+    "evidence_score", "max_applications_per_season",
+})
+
+
+def _mutate_noop(inference_result):
+    return inference_result
+
+
+def _mutate_low_confidence(inference_result):
+    inference_result["disease"]["confidence"] = 0.3
+    return inference_result
+
+
+def _mutate_healthy(inference_result):
+    inference_result["disease"]["id"] = "healthy"
+    inference_result["disease"]["name"] = "Healthy Plant"
+    inference_result["disease"]["confidence"] = 0.95
+    return inference_result
+
+
+def _check_basic(response, validators, inference_result, recommendations):
+    validate_inference_result, validate_recommendations, validate_response = validators
+    validate_inference_result(inference_result)
+    validate_recommendations(recommendations)
+    validate_response(response)
+    for treatment in response["recommended_treatments"]:
+        assert "icon" in treatment
+        assert "badge" in treatment
+        assert "color" in treatment
+
+
+def _check_metadata(response, validators, inference_result, recommendations):
+    metadata = response["metadata"]
+    assert metadata["crop_type"] == "Tomato"
+    assert metadata["growth_stage"] == "flowering"
+    assert metadata["location"] == "California"
+    assert metadata["language"] == "es"
+
+
+def _check_low_confidence(response, validators, inference_result, recommendations):
+    assert "uncertainty_warning" in response
+    assert response["uncertainty_warning"] is not None
+    assert all(
+        t.get("requires_confirmation", False) is True
+        for t in response["recommended_treatments"]
+        if t["type"] == "chemical"
+    )
+
+
+def _check_healthy(response, validators, inference_result, recommendations):
+    assert response["disease"]["id"] == "healthy"
+    assert len(response["recommended_treatments"]) == 1
+    assert response["recommended_treatments"][0]["type"] == "organic"
+    assert "Preventive care" in response["recommended_treatments"][0]["name"]
+    assert response.get("uncertainty_warning") is None
+
+
+def _check_sdg(response, validators, inference_result, recommendations):
+    assert "sdg_alignment" in response
+    assert len(response["sdg_alignment"]) > 0
+    # Parse the goal number out of each "SDG <n>: ..." entry and compare
+    # sets instead of substring-scanning one joined string
+    sdg_ids = {
+        int(item.split()[1].rstrip(':'))
+        for item in response["sdg_alignment"]
+        if item.startswith("SDG")
+    }
+    assert {3, 12, 15} <= sdg_ids
+
+
+# One table for the tests that share the full three-step pipeline
+# (process_image -> get_recommendations -> format_detection_response)
+# and diverge only in how they mutate the input and what they assert.
+_WORKFLOW_CASES = [
+    pytest.param(_mutate_noop, {}, "en", _check_basic, id="basic"),
+    pytest.param(
+        _mutate_noop,
+        {"crop_type": "Tomato", "growth_stage": "flowering", "location": "California"},
+        "es", _check_metadata, id="metadata",
+    ),
+    pytest.param(_mutate_low_confidence, {}, "en", _check_low_confidence, id="low_confidence"),
+    pytest.param(_mutate_healthy, {}, "en", _check_healthy, id="healthy"),
+    pytest.param(_mutate_noop, {}, "en", _check_sdg, id="sdg"),
+]
+
+
 class TestSystemIntegration:
     """Integration tests for the complete system."""
     
-    @pytest.fixture
-    def inference_engine(self):
-        """Create inference engine for testing."""
-        return InferenceEngine("config.yaml")
-    
-    @pytest.fixture
-    def recommendation_engine(self):
-        """Create recommendation engine for testing."""
-        return RecommendationEngine("diseases.yml", "config.yaml")
-    
-    @pytest.fixture
-    def formatter(self):
-        """Create formatter for testing."""
-        return ResponseFormatter("config.yaml")
-    
-    @pytest.fixture
-    def cli_instance(self):
-        """Create CLI instance for testing."""
-        return PlantCareCLI("config.yaml")
-    
-    @pytest.fixture
-    def test_image_bytes(self):
-        """Create test image bytes."""
-        img = Image.new('RGB', (300, 300), color='green')
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format='JPEG')
-        return img_bytes.getvalue()
-    
-    def test_complete_workflow_mock_mode(self, inference_engine, recommendation_engine, formatter, test_image_bytes):
-        """Test complete workflow in mock mode."""
-        # Step 1: Process image through inference
-        inference_result = inference_engine.process_image(test_image_bytes, "test.jpg")
-        
-        # Verify inference result structure
-        assert "disease" in inference_result
-        assert "image_metadata" in inference_result
-        assert "model_info" in inference_result
-        
-        disease_id = inference_result["disease"]["id"]
-        confidence = inference_result["disease"]["confidence"]
-        
-        # Step 2: Generate recommendations
-        recommendations = recommendation_engine.get_recommendations(
-            disease_id=disease_id,
-            confidence=confidence,
-            farmer_language="en"
-        )
-        
-        # Verify recommendations structure
-        assert "disease" in recommendations
-        assert "recommended_treatments" in recommendations
-        assert "sdg_alignment" in recommendations
-        assert "notes" in recommendations
-        
-        # Step 3: Format complete response
-        response = formatter.format_detection_response(
-            inference_result=inference_result,
-            recommendations=recommendations,
-            farmer_language="en"
-        )
-        
-        # Verify complete response structure
-        assert "disease" in response
-        assert "recommended_treatments" in response
-        assert "sdg_alignment" in response
-        assert "notes" in response
-        assert "supporting_heatmap_base64" in response
-        assert "metadata" in response
-        
-        # Verify treatments have visual indicators
-        treatments = response["recommended_treatments"]
-        if treatments:
-            for treatment in treatments:
-                assert "icon" in treatment
-                assert "badge" in treatment
-                assert "color" in treatment
-    
-    def test_workflow_with_metadata(self, inference_engine, recommendation_engine, formatter, test_image_bytes):
-        """Test workflow with additional metadata."""
-        # Process image
-        inference_result = inference_engine.process_image(test_image_bytes, "test.jpg")
-        
-        # Generate recommendations with metadata
+    @pytest.mark.parametrize("mutate, rec_kwargs, language, check", _WORKFLOW_CASES)
+    def test_workflow(self, inference_engine, recommendation_engine, formatter, test_image_bytes,
+                      validate_inference_result, validate_recommendations, validate_response,
+                      mutate, rec_kwargs, language, check):
+        """Run the full pipeline once per case and apply its assertions."""
+        inference_result = mutate(inference_engine.process_image(test_image_bytes, "test.jpg"))
+
         recommendations = recommendation_engine.get_recommendations(
             disease_id=inference_result["disease"]["id"],
             confidence=inference_result["disease"]["confidence"],
-            crop_type="Tomato",
-            growth_stage="flowering",
-            location="California",
-            farmer_language="es"
+            farmer_language=language,
+            **rec_kwargs
         )
-        
-        # Format response
+
         response = formatter.format_detection_response(
             inference_result=inference_result,
             recommendations=recommendations,
-            farmer_language="es"
-        )
-        
-        # Verify metadata is preserved
-        metadata = response["metadata"]
-        assert metadata["crop_type"] == "Tomato"
-        assert metadata["growth_stage"] == "flowering"
-        assert metadata["location"] == "California"
-        assert metadata["language"] == "es"
-    
-    def test_low_confidence_workflow(self, inference_engine, recommendation_engine, formatter, test_image_bytes):
-        """Test workflow with low confidence prediction."""
-        # Process image
-        inference_result = inference_engine.process_image(test_image_bytes, "test.jpg")
-        
-        # Manually set low confidence for testing
-        inference_result["disease"]["confidence"] = 0.3
-        
-        # Generate recommendations
-        recommendations = recommendation_engine.get_recommendations(
-            disease_id=inference_result["disease"]["id"],
-            confidence=0.3,
-            farmer_language="en"
+            farmer_language=language
         )
-        
-        # Format response
-        response = formatter.format_detection_response(
-            inference_result=inference_result,
-            recommendations=recommendations,
-            farmer_language="en"
+
+        check(
+            response,
+            (validate_inference_result, validate_recommendations, validate_response),
+            inference_result,
+            recommendations,
         )
-        
-        # Verify uncertainty warning is present
-        assert "uncertainty_warning" in response
-        assert response["uncertainty_warning"] is not None
-        
-        # Verify chemical treatments require confirmation
-        chemical_treatments = [t for t in response["recommended_treatments"] if t["type"] == "chemical"]
-        for treatment in chemical_treatments:
-            assert treatment.get("requires_confirmation", False) is True
     
-    def test_healthy_plant_workflow(self, inference_engine, recommendation_engine, formatter, test_image_bytes):
-        """Test workflow for healthy plant detection."""
-        # Process image
-        inference_result = inference_engine.process_image(test_image_bytes, "test.jpg")
-        
-        # Manually set to healthy for testing
-        inference_result["disease"]["id"] = "healthy"
-        inference_result["disease"]["name"] = "Healthy Plant"
-        inference_result["disease"]["confidence"] = 0.95
-        
-        # Generate recommendations
+    @pytest.fixture(scope="module")
+    def shared_inference_result(self, inference_engine, test_image_bytes):
+        """Run inference once for the tests that only vary downstream args."""
+        return inference_engine.process_image(test_image_bytes, "test.jpg")
+    
+    @pytest.mark.parametrize("language", ["en", "es", "fr", "hi", "pt"])
+    def test_multilingual_support(self, shared_inference_result, recommendation_engine, formatter, language):
+        """Test multilingual support in the workflow."""
+        # Generate recommendations (inference result shared across cases)
         recommendations = recommendation_engine.get_recommendations(
-            disease_id="healthy",
-            confidence=0.95,
-            farmer_language="en"
+            disease_id=shared_inference_result["disease"]["id"],
+            confidence=shared_inference_result["disease"]["confidence"],
+            farmer_language=language
         )
         
         # Format response
         response = formatter.format_detection_response(
-            inference_result=inference_result,
+            inference_result=shared_inference_result,
             recommendations=recommendations,
-            farmer_language="en"
+            farmer_language=language
         )
         
-        # Verify healthy plant response
-        assert response["disease"]["id"] == "healthy"
-        assert len(response["recommended_treatments"]) == 1
-        assert response["recommended_treatments"][0]["type"] == "organic"
-        assert "Preventive care" in response["recommended_treatments"][0]["name"]
-        assert response.get("uncertainty_warning") is None
-    
-    def test_multilingual_support(self, inference_engine, recommendation_engine, formatter, test_image_bytes):
-        """Test multilingual support in the workflow."""
-        languages = ["en", "es", "fr", "hi", "pt"]
-        
-        for language in languages:
-            # Process image
-            inference_result = inference_engine.process_image(test_image_bytes, "test.jpg")
-            
-            # Generate recommendations
-            recommendations = recommendation_engine.get_recommendations(
-                disease_id=inference_result["disease"]["id"],
-                confidence=inference_result["disease"]["confidence"],
-                farmer_language=language
-            )
-            
-            # Format response
-            response = formatter.format_detection_response(
-                inference_result=inference_result,
-                recommendations=recommendations,
-                farmer_language=language
-            )
-            
-            # Verify language is preserved
-            assert response["metadata"]["language"] == language
-            assert "labels" in response
+        # Verify language is preserved
+        assert response["metadata"]["language"] == language
+        assert "labels" in response
     
     def test_anti_overuse_integration(self, recommendation_engine):
         """Test anti-overuse logic integration."""
@@ -228,45 +178,16 @@ class TestSystemIntegration:
         assert result_invalid["valid"] is False
         assert result_invalid["blocked"] is True
     
-    def test_sdg_alignment_consistency(self, inference_engine, recommendation_engine, formatter, test_image_bytes):
-        """Test that SDG alignment is consistent across the system."""
-        # Process image
-        inference_result = inference_engine.process_image(test_image_bytes, "test.jpg")
-        
-        # Generate recommendations
-        recommendations = recommendation_engine.get_recommendations(
-            disease_id=inference_result["disease"]["id"],
-            confidence=inference_result["disease"]["confidence"],
-            farmer_language="en"
-        )
-        
-        # Format response
-        response = formatter.format_detection_response(
-            inference_result=inference_result,
-            recommendations=recommendations,
-            farmer_language="en"
-        )
-        
-        # Verify SDG alignment
-        assert "sdg_alignment" in response
-        assert len(response["sdg_alignment"]) > 0
-        
-        # Check that SDG alignment contains expected goals
-        sdg_text = " ".join(response["sdg_alignment"])
-        assert "SDG 12" in sdg_text
-        assert "SDG 3" in sdg_text
-        assert "SDG 15" in sdg_text
+    @pytest.fixture(scope="class")
+    def cli_analysis_result(self, cli_instance, test_image_path):
+        """Run analyze_image once for the tests that only reformat it."""
+        return cli_instance.analyze_image(test_image_path, language="en")
     
-    def test_cli_workflow(self, cli_instance, test_image_bytes, tmp_path):
+    def test_cli_workflow(self, cli_instance, test_image_path):
         """Test complete CLI workflow."""
-        # Create a temporary image file
-        image_path = tmp_path / "test_image.jpg"
-        with open(image_path, 'wb') as f:
-            f.write(test_image_bytes)
-        
         # Test image analysis
         result = cli_instance.analyze_image(
-            image_path=str(image_path),
+            image_path=test_image_path,
             crop_type="Tomato",
             growth_stage="flowering",
             location="California",
@@ -296,15 +217,10 @@ class TestSystemIntegration:
         )
         assert "valid" in validation_result
     
-    def test_cli_output_formatting(self, cli_instance, test_image_bytes, tmp_path):
+    def test_cli_output_formatting(self, cli_instance, cli_analysis_result):
         """Test CLI output formatting."""
-        # Create a temporary image file
-        image_path = tmp_path / "test_image.jpg"
-        with open(image_path, 'wb') as f:
-            f.write(test_image_bytes)
-        
-        # Test JSON output
-        result = cli_instance.analyze_image(str(image_path), language="en")
+        # Test JSON output (analysis is shared; only formatting runs here)
+        result = cli_analysis_result
         json_output = cli_instance.format_output(result, "json")
         assert isinstance(json_output, str)
         
@@ -317,6 +233,7 @@ class TestSystemIntegration:
         table_output = cli_instance.format_output(result, "table")
         assert isinstance(table_output, str)
     
+    @pytest.mark.order("first")
     def test_error_handling_integration(self, inference_engine):
         """Test error handling in the integration workflow."""
         # Test with invalid image data
@@ -327,9 +244,8 @@ class TestSystemIntegration:
     
     def test_configuration_loading(self):
         """Test that all configuration files load correctly."""
-        # Test main config
-        with open("config.yaml", 'r') as f:
-            config = yaml.safe_load(f)
+        # Test main config (memoized C-loader parse shared with the engines)
+        config = load_yaml("config.yaml")
         
         assert "model" in config
         assert "image" in config
@@ -339,8 +255,7 @@ class TestSystemIntegration:
         assert "sdg_alignment" in config
         
         # Test diseases config
-        with open("diseases.yml", 'r') as f:
-            diseases = yaml.safe_load(f)
+        diseases = load_yaml("diseases.yml")
         
         assert "powdery_mildew" in diseases
         assert "bacterial_spot" in diseases
@@ -349,13 +264,7 @@ class TestSystemIntegration:
         
         # Verify disease structure
         for disease_id, disease_info in diseases.items():
-            assert "name" in disease_info
-            assert "remedies" in disease_info
-            
+            assert REQUIRED_DISEASE_KEYS <= disease_info.keys()
+
             for remedy in disease_info["remedies"]:
-                assert "type" in remedy
-                assert "name" in remedy
-                assert "application" in remedy
-                assert "safety" in remedy
-                assert "evidence_score" in remedy
-                assert "max_applications_per_season" in remedy
+                assert REQUIRED_REMEDY_KEYS <= remedy.keys()
@@ -2,6 +2,7 @@
 Unit tests for recommendation engine module.
 """
 
+import numpy as np
 import pytest
 import yaml
 from modules.recommender import RecommendationEngine, TreatmentRemedy
@@ -10,11 +11,6 @@ from modules.recommender import RecommendationEngine, TreatmentRemedy
 class TestRecommendationEngine:
     """Test cases for RecommendationEngine class."""
     
-    @pytest.fixture
-    def engine(self):
-        """Create RecommendationEngine instance for testing."""
-        return RecommendationEngine("diseases.yml", "config.yaml")
-    
     def test_get_recommendations_healthy_plant(self, engine):
         """Test recommendations for healthy plants."""
         result = engine.get_recommendations(
@@ -29,13 +25,23 @@ class TestRecommendationEngine:
         assert result["recommended_treatments"][0]["type"] == "organic"
         assert "Preventive care" in result["recommended_treatments"][0]["name"]
     
-    def test_get_recommendations_powdery_mildew(self, engine):
+    @pytest.fixture(scope="class")
+    def powdery_sweep(self, engine):
+        """One batched engine call covering every confidence the class probes.
+
+        The batch path filters remedies once per distinct confidence, so
+        the sweep tests share that work instead of redoing it per test.
+        """
+        confidences = [0.3, 0.6, 0.8, 0.85]
+        results = engine.get_recommendations_batch([
+            {"disease_id": "powdery_mildew", "confidence": c, "farmer_language": "en"}
+            for c in confidences
+        ])
+        return dict(zip(confidences, results))
+
+    def test_get_recommendations_powdery_mildew(self, powdery_sweep):
         """Test recommendations for powdery mildew."""
-        result = engine.get_recommendations(
-            disease_id="powdery_mildew",
-            confidence=0.85,
-            farmer_language="en"
-        )
+        result = powdery_sweep[0.85]
         
         assert result["disease"]["id"] == "powdery_mildew"
         assert result["disease"]["name"] == "Powdery Mildew"
@@ -50,23 +56,22 @@ class TestRecommendationEngine:
         # First treatment should be organic
         assert result["recommended_treatments"][0]["type"] == "organic"
     
-    def test_low_confidence_recommendations(self, engine):
+    def test_low_confidence_recommendations(self, powdery_sweep):
         """Test recommendations for low confidence predictions."""
-        result = engine.get_recommendations(
-            disease_id="powdery_mildew",
-            confidence=0.3,  # Below low confidence threshold
-            farmer_language="en"
-        )
+        result = powdery_sweep[0.3]  # Below low confidence threshold
         
         # Should still provide recommendations but with uncertainty warning
         assert result["uncertainty_warning"] is not None
-        assert "Low confidence" in result["uncertainty_warning"]
+        assert result["uncertainty_warning"].startswith("Low confidence")
         
         # Chemical treatments should require confirmation
-        chemical_treatments = [t for t in result["recommended_treatments"] if t["type"] == "chemical"]
-        for treatment in chemical_treatments:
-            assert treatment.get("requires_confirmation", False) is True
+        assert all(
+            t.get("requires_confirmation", False) is True
+            for t in result["recommended_treatments"]
+            if t["type"] == "chemical"
+        )
     
+    @pytest.mark.order("first")
     def test_unknown_disease_handling(self, engine):
         """Test handling of unknown diseases."""
         result = engine.get_recommendations(
@@ -78,7 +83,7 @@ class TestRecommendationEngine:
         assert result["disease"]["id"] == "unknown"
         assert result["disease"]["name"] == "Unknown Disease"
         assert len(result["recommended_treatments"]) == 0
-        assert "Unknown disease detected" in result["notes"]
+        assert result["notes"].startswith("Unknown disease detected")
     
     def test_decision_rules_organic_first(self, engine):
         """Test that organic treatments are prioritized."""
@@ -90,32 +95,28 @@ class TestRecommendationEngine:
         
         treatments = result["recommended_treatments"]
         
-        # Find first organic and first chemical treatment
-        first_organic_idx = None
-        first_chemical_idx = None
-        
-        for i, treatment in enumerate(treatments):
-            if treatment["type"] == "organic" and first_organic_idx is None:
-                first_organic_idx = i
-            elif treatment["type"] == "chemical" and first_chemical_idx is None:
-                first_chemical_idx = i
+        # Find first organic and first chemical treatment (argmax on a
+        # boolean array gives the first True index)
+        types = np.array([t["type"] for t in treatments])
+        is_organic = types == "organic"
+        is_chemical = types == "chemical"
         
         # Organic treatments should come before chemical treatments
-        if first_organic_idx is not None and first_chemical_idx is not None:
-            assert first_organic_idx < first_chemical_idx
+        if is_organic.any() and is_chemical.any():
+            assert np.argmax(is_organic) < np.argmax(is_chemical)
     
-    def test_evidence_score_filtering(self, engine):
+    def test_evidence_score_filtering(self, powdery_sweep):
         """Test filtering based on evidence scores."""
-        result = engine.get_recommendations(
-            disease_id="powdery_mildew",
-            confidence=0.6,  # Medium confidence
-            farmer_language="en"
-        )
+        result = powdery_sweep[0.6]  # Medium confidence
         
-        # All treatments should have evidence scores that match the confidence level
-        for treatment in result["recommended_treatments"]:
-            if treatment["type"] == "chemical":
-                assert treatment["evidence_score"] <= 0.6  # Should be filtered out if evidence_score > confidence
+        # All chemical treatments should have evidence scores within the
+        # confidence level (higher-scored ones are filtered out)
+        scores = np.fromiter(
+            (t["evidence_score"] for t in result["recommended_treatments"]
+             if t["type"] == "chemical"),
+            dtype=np.float64,
+        )
+        assert (scores <= 0.6).all()
     
     def test_human_summary_generation(self, engine):
         """Test human summary generation."""
@@ -131,7 +132,7 @@ class TestRecommendationEngine:
         assert "Powdery Mildew" in summary
         
         # Should contain treatment information
-        assert "Try:" in summary or "Detected:" in summary
+        assert summary.startswith(("Detected:", "Try:"))
     
     def test_sdg_alignment(self, engine):
         """Test SDG alignment inclusion."""
@@ -143,7 +144,7 @@ class TestRecommendationEngine:
         
         assert "sdg_alignment" in result
         assert len(result["sdg_alignment"]) > 0
-        assert any("SDG" in sdg for sdg in result["sdg_alignment"])
+        assert any(sdg.startswith("SDG") for sdg in result["sdg_alignment"])
     
     def test_metadata_inclusion(self, engine):
         """Test that metadata is included in results."""
@@ -173,6 +174,7 @@ class TestRecommendationEngine:
         assert result["valid"] is True
         assert result["blocked"] is False
     
+    @pytest.mark.order("first")
     def test_dosage_validation_unknown_disease(self, engine):
         """Test dosage validation for unknown disease."""
         result = engine.validate_dosage(
@@ -183,8 +185,9 @@ class TestRecommendationEngine:
         
         assert result["valid"] is False
         assert result["blocked"] is True
-        assert "Unknown disease" in result["warning"]
+        assert result["warning"].startswith("Unknown disease")
     
+    @pytest.mark.order("first")
     def test_dosage_validation_unknown_remedy(self, engine):
         """Test dosage validation for unknown remedy."""
         result = engine.validate_dosage(
@@ -195,7 +198,7 @@ class TestRecommendationEngine:
         
         assert result["valid"] is False
         assert result["blocked"] is True
-        assert "Remedy not found" in result["warning"]
+        assert result["warning"].startswith("Remedy not found")
     
     def test_get_treatment_by_id_existing(self, engine):
         """Test getting treatment by ID for existing disease."""
@@ -206,6 +209,7 @@ class TestRecommendationEngine:
         assert result["disease"]["name"] == "Powdery Mildew"
         assert len(result["remedies"]) > 0
     
+    @pytest.mark.order("first")
     def test_get_treatment_by_id_nonexistent(self, engine):
         """Test getting treatment by ID for non-existent disease."""
         result = engine.get_treatment_by_id("nonexistent_disease")
@@ -232,23 +236,13 @@ class TestRecommendationEngine:
         assert remedy.evidence_score == 0.8
         assert remedy.requires_confirmation is False  # Default value
     
-    def test_uncertainty_message_generation(self, engine):
+    def test_uncertainty_message_generation(self, engine, powdery_sweep):
         """Test uncertainty message generation."""
         # Test low confidence
-        result_low = engine.get_recommendations(
-            disease_id="powdery_mildew",
-            confidence=0.3,
-            farmer_language="en"
-        )
-        assert result_low["uncertainty_warning"] is not None
+        assert powdery_sweep[0.3]["uncertainty_warning"] is not None
         
         # Test high confidence
-        result_high = engine.get_recommendations(
-            disease_id="powdery_mildew",
-            confidence=0.8,
-            farmer_language="en"
-        )
-        assert result_high["uncertainty_warning"] is None
+        assert powdery_sweep[0.8]["uncertainty_warning"] is None
         
         # Test healthy plant (should not have uncertainty warning)
         result_healthy = engine.get_recommendations(
@@ -4,14 +4,22 @@ Simple web server for Plant Care System
 Handles image uploads and runs analysis
 """
 
+import io
 import os
 import sys
+import gzip
 import json
-import tempfile
+import hashlib
 from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import logging
+import queue
+import socket
+import threading
+import time
 
 # Add the project root to Python path
 project_root = Path(__file__).parent
@@ -20,11 +28,154 @@ sys.path.insert(0, str(project_root))
 # Import our modules
 from main import analyze_image_programmatically
 
+# Optional: python-multipart's SAX-style parser is one optimized state
+# machine over the byte stream; the hand-rolled scanner is the fallback
+try:
+    from multipart.multipart import MultipartParser, parse_options_header
+except ImportError:
+    MultipartParser = None
+
+# Optional: orjson serializes straight to UTF-8 bytes in C. Responses are
+# compact by default (browsers never see the whitespace); set DEBUG for
+# indented output when poking the API by hand.
+_DEBUG_JSON = bool(os.getenv('DEBUG'))
+try:
+    import orjson
+
+    def _json_response_bytes(data):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if _DEBUG_JSON else 0)
+except ImportError:
+    def _json_response_bytes(data):
+        return json.dumps(data, indent=2 if _DEBUG_JSON else None).encode('utf-8')
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Worker-pool plumbing: each worker process builds the CLI (config,
+# engines, model) once in its initializer, so requests only pay for the
+# analysis itself and inference runs outside the serving process's GIL
+_worker_cli = None
+
+
+def _warm_worker():
+    """Build the CLI and its engines once per worker process."""
+    global _worker_cli
+    from modules.cli import PlantCareCLI
+    _worker_cli = PlantCareCLI()
+    # The engines are lazy properties, so the constructor alone builds
+    # nothing — touch each one so config parsing and model loading
+    # happen here rather than on the first request
+    _worker_cli.inference_engine
+    _worker_cli.recommendation_engine
+    _worker_cli.formatter
+
+
+def _analyze_in_worker(kwargs):
+    return _worker_cli.analyze_image(**kwargs)
+
+
+ANALYSIS_TIMEOUT_S = 30
+
+# Users re-submit the same photo (refresh, retry, tweaking the text
+# fields); identical analyses are memoized by image digest + request
+# fields so a repeat skips the model run entirely
+_ANALYSIS_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_ANALYSIS_CACHE_MAX = 512
+_ANALYSIS_TTL_S = 3600
+_analysis_cache_lock = threading.Lock()
+
+
+def _analysis_cache_get(key):
+    with _analysis_cache_lock:
+        entry = _ANALYSIS_CACHE.get(key)
+        if entry is None:
+            return None
+        stamp, result = entry
+        if time.monotonic() - stamp > _ANALYSIS_TTL_S:
+            del _ANALYSIS_CACHE[key]
+            return None
+        _ANALYSIS_CACHE.move_to_end(key)
+        return result
+
+
+def _analysis_cache_put(key, result):
+    with _analysis_cache_lock:
+        _ANALYSIS_CACHE[key] = (time.monotonic(), result)
+        _ANALYSIS_CACHE.move_to_end(key)
+        while len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_MAX:
+            _ANALYSIS_CACHE.popitem(last=False)
+
+# Index page cache: read and encode the page once at startup, keep a
+# pre-compressed copy, and tag it so repeat visitors get a bodyless 304
+_HTML_PATH = project_root / 'plant_care_website.html'
+try:
+    _HTML_BYTES = _HTML_PATH.read_bytes()
+    _HTML_GZ = gzip.compress(_HTML_BYTES, 6)
+    _HTML_ETAG = '"%s"' % hashlib.blake2b(_HTML_BYTES, digest_size=8).hexdigest()
+except OSError:
+    _HTML_BYTES = None
+
+# Upload streaming: bytes are read from the socket in chunks of this size
+# and the file part is written straight to the temp file, so memory use
+# stays constant instead of scaling with the upload
+CHUNK_SIZE = 64 * 1024
+
+# Uploads are staged in memory; capped so one request cannot exhaust RAM
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
+# Magic numbers for the formats config.yaml accepts; the first bytes of
+# the upload decide the container, so mislabeled or garbage files are
+# rejected before the analyzer runs
+_IMAGE_MAGIC = {
+    b'\xff\xd8\xff': '.jpg',
+    b'\x89PNG': '.png',
+}
+
+
+def _sniff_image_suffix(head):
+    for magic, suffix in _IMAGE_MAGIC.items():
+        if head.startswith(magic):
+            return suffix
+    return None
+
+# Small bounded pool of read buffers so concurrent uploads reuse the
+# same chunk-sized bytearrays (via readinto) instead of allocating a
+# fresh bytes object per socket read
+_BUF_POOL: "queue.LifoQueue[bytearray]" = queue.LifoQueue(maxsize=32)
+
+
+def _acquire_buf():
+    try:
+        return _BUF_POOL.get_nowait()
+    except queue.Empty:
+        return bytearray(CHUNK_SIZE)
+
+
+def _release_buf(buf):
+    try:
+        _BUF_POOL.put_nowait(buf)
+    except queue.Full:
+        pass
+
 class PlantCareHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps the browser's connection open between the page load
+    # and the /analyze POST instead of paying a handshake per request;
+    # every response path declares Content-Length so this is safe
+    protocol_version = "HTTP/1.1"
+
+    # socketserver hook: sets TCP_NODELAY so the small JSON responses
+    # are not held back by Nagle's algorithm
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        if hasattr(socket, 'TCP_QUICKACK'):
+            try:
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+            except OSError:
+                pass
+
     def do_GET(self):
         """Handle GET requests"""
         parsed_path = urlparse(self.path)
@@ -46,22 +197,205 @@ class PlantCareHandler(BaseHTTPRequestHandler):
             self.send_error(404, "Not Found")
 
     def serve_html(self):
-        """Serve the main HTML page"""
+        """Serve the main HTML page from the in-memory cache"""
+        if _HTML_BYTES is None:
+            self.send_error(404, "HTML file not found")
+            return
+
         try:
-            with open('plant_care_website.html', 'r', encoding='utf-8') as f:
-                content = f.read()
-            
+            if self.headers.get('If-None-Match') == _HTML_ETAG:
+                self.send_response(304)
+                self.send_header('ETag', _HTML_ETAG)
+                self.end_headers()
+                return
+
+            body = _HTML_BYTES
+            encoding = None
+            if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                body = _HTML_GZ
+                encoding = 'gzip'
+
             self.send_response(200)
             self.send_header('Content-Type', 'text/html; charset=utf-8')
             self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(content.encode('utf-8'))
-        except FileNotFoundError:
-            self.send_error(404, "HTML file not found")
+            self.send_header('ETag', _HTML_ETAG)
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            self.send_header('Content-Length', str(len(body)))
+            self._send_headers_and_body(body)
         except Exception as e:
             logger.error(f"Error serving HTML: {e}")
             self.send_error(500, f"Error serving page: {str(e)}")
 
+    def _stream_multipart(self, boundary, content_length, file_sink):
+        """Stream a multipart body, writing the file part to file_sink.
+
+        Scans for part boundaries across chunk seams with a rolling
+        buffer, so the upload never has to fit in memory and the body is
+        never split into a list of parts. Returns (text fields dict,
+        bytes written to file_sink).
+        """
+        delim = b'--' + boundary.encode('utf-8')
+        # Longest tail that could hold a boundary split across two chunks
+        keep = len(delim) + 4
+
+        fields = {}
+        buf = bytearray()
+        remaining = content_length
+        state = 'preamble'  # -> 'headers' -> 'body' -> 'headers' ...
+        part_name = None
+        field_buf = None
+        file_bytes = 0
+
+        while True:
+            need_more = False
+
+            if state == 'preamble':
+                i = buf.find(delim)
+                if i == -1:
+                    del buf[:max(0, len(buf) - keep)]
+                    need_more = True
+                else:
+                    del buf[:i + len(delim)]
+                    state = 'headers'
+
+            if state == 'headers' and not need_more:
+                if len(buf) < 2 and remaining > 0:
+                    need_more = True
+                elif buf.startswith(b'--'):
+                    break  # closing delimiter
+                else:
+                    j = buf.find(b'\r\n\r\n')
+                    if j == -1:
+                        need_more = True
+                    else:
+                        headers = bytes(buf[:j])
+                        del buf[:j + 4]
+                        name_start = headers.find(b'name="')
+                        if name_start != -1:
+                            name_start += 6
+                            part_name = headers[
+                                name_start:headers.index(b'"', name_start)
+                            ].decode('utf-8')
+                        else:
+                            part_name = None
+                        field_buf = bytearray()
+                        state = 'body'
+
+            if state == 'body' and not need_more:
+                i = buf.find(delim)
+                if i == -1:
+                    # Flush everything that cannot contain the delimiter
+                    spill = len(buf) - keep
+                    if spill > 0:
+                        if part_name == 'file':
+                            file_sink.write(buf[:spill])
+                            file_bytes += spill
+                        elif part_name:
+                            field_buf += buf[:spill]
+                        del buf[:spill]
+                    need_more = True
+                else:
+                    data = buf[:i]
+                    if data.endswith(b'\r\n'):
+                        data = data[:-2]
+                    if part_name == 'file':
+                        file_sink.write(data)
+                        file_bytes += len(data)
+                    elif part_name:
+                        field_buf += data
+                        fields[part_name] = bytes(field_buf).decode('utf-8').strip()
+                    del buf[:i + len(delim)]
+                    state = 'headers'
+                    continue
+
+            if need_more:
+                if remaining <= 0:
+                    break
+                read_buf = _acquire_buf()
+                try:
+                    view = memoryview(read_buf)[:min(CHUNK_SIZE, remaining)]
+                    n = self.rfile.readinto(view)
+                    if not n:
+                        break
+                    remaining -= n
+                    buf += view[:n]
+                finally:
+                    _release_buf(read_buf)
+
+        return fields, file_bytes
+
+    def _stream_multipart_lib(self, boundary, content_length, file_sink):
+        """Stream a multipart body through python-multipart's parser.
+
+        Same contract as _stream_multipart, but the boundary scanning is
+        done by the library's single-pass state machine; the callbacks
+        only route bytes to file_sink or the field buffers.
+        """
+        fields = {}
+        state = {
+            'name': None,
+            'field_buf': bytearray(),
+            'header_field': bytearray(),
+            'header_value': bytearray(),
+            'disposition': b'',
+            'file_bytes': 0,
+        }
+
+        def on_header_field(data, start, end):
+            state['header_field'] += data[start:end]
+
+        def on_header_value(data, start, end):
+            state['header_value'] += data[start:end]
+
+        def on_header_end():
+            if bytes(state['header_field']).lower() == b'content-disposition':
+                state['disposition'] = bytes(state['header_value'])
+            state['header_field'].clear()
+            state['header_value'].clear()
+
+        def on_headers_finished():
+            _, params = parse_options_header(state['disposition'])
+            name = params.get(b'name')
+            state['name'] = name.decode('utf-8') if name else None
+            state['disposition'] = b''
+            state['field_buf'] = bytearray()
+
+        def on_part_data(data, start, end):
+            if state['name'] == 'file':
+                file_sink.write(data[start:end])
+                state['file_bytes'] += end - start
+            elif state['name']:
+                state['field_buf'] += data[start:end]
+
+        def on_part_end():
+            if state['name'] and state['name'] != 'file':
+                fields[state['name']] = bytes(state['field_buf']).decode('utf-8').strip()
+
+        parser = MultipartParser(boundary.encode('utf-8'), {
+            'on_header_field': on_header_field,
+            'on_header_value': on_header_value,
+            'on_header_end': on_header_end,
+            'on_headers_finished': on_headers_finished,
+            'on_part_data': on_part_data,
+            'on_part_end': on_part_end,
+        })
+
+        remaining = content_length
+        read_buf = _acquire_buf()
+        try:
+            view = memoryview(read_buf)
+            while remaining > 0:
+                n = self.rfile.readinto(view[:min(CHUNK_SIZE, remaining)])
+                if not n:
+                    break
+                remaining -= n
+                parser.write(bytes(view[:n]))
+        finally:
+            _release_buf(read_buf)
+
+        return fields, state['file_bytes']
+
     def handle_analyze(self):
         """Handle image analysis requests"""
         try:
@@ -71,114 +405,123 @@ class PlantCareHandler(BaseHTTPRequestHandler):
                 self.send_error(400, "Content-Type must be multipart/form-data")
                 return
 
-            # Read the request body
+            # Chunked bodies carry no Content-Length, so the streaming
+            # parser cannot bound them; require an explicit length
+            if 'chunked' in self.headers.get('Transfer-Encoding', ''):
+                self.send_error(411, "Length Required")
+                return
+
             content_length = int(self.headers.get('Content-Length', 0))
             if content_length == 0:
                 self.send_error(400, "No content provided")
                 return
+            if content_length > MAX_UPLOAD_BYTES:
+                self.send_error(413, "Upload too large")
+                return
 
-            body = self.rfile.read(content_length)
-            
-            # Parse multipart data (simplified)
             boundary = content_type.split('boundary=')[1]
-            parts = body.split(f'--{boundary}'.encode())
-            
-            image_data = None
-            crop_type = None
-            growth_stage = None
-            location = None
-            language = 'en'
-            
-            for part in parts:
-                if b'name="file"' in part:
-                    # Extract image data
-                    header_end = part.find(b'\r\n\r\n')
-                    if header_end != -1:
-                        image_data = part[header_end + 4:]
-                        # Remove trailing boundary markers
-                        if image_data.endswith(b'\r\n'):
-                            image_data = image_data[:-2]
-                elif b'name="crop_type"' in part:
-                    header_end = part.find(b'\r\n\r\n')
-                    if header_end != -1:
-                        crop_type = part[header_end + 4:].decode('utf-8').strip()
-                        if crop_type.endswith('\r\n'):
-                            crop_type = crop_type[:-2]
-                elif b'name="growth_stage"' in part:
-                    header_end = part.find(b'\r\n\r\n')
-                    if header_end != -1:
-                        growth_stage = part[header_end + 4:].decode('utf-8').strip()
-                        if growth_stage.endswith('\r\n'):
-                            growth_stage = growth_stage[:-2]
-                elif b'name="location"' in part:
-                    header_end = part.find(b'\r\n\r\n')
-                    if header_end != -1:
-                        location = part[header_end + 4:].decode('utf-8').strip()
-                        if location.endswith('\r\n'):
-                            location = location[:-2]
-                elif b'name="language"' in part:
-                    header_end = part.find(b'\r\n\r\n')
-                    if header_end != -1:
-                        language = part[header_end + 4:].decode('utf-8').strip()
-                        if language.endswith('\r\n'):
-                            language = language[:-2]
-
-            if not image_data:
+
+            # Stream the upload into memory; the analyzer accepts bytes
+            # directly, so there is no temp-file write/read round-trip
+            parse_upload = (self._stream_multipart_lib if MultipartParser is not None
+                            else self._stream_multipart)
+            image_buf = io.BytesIO()
+            fields, file_bytes = parse_upload(boundary, content_length, image_buf)
+
+            if file_bytes == 0:
                 self.send_error(400, "No image file provided")
                 return
 
-            # Save image to temporary file
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_file:
-                temp_file.write(image_data)
-                temp_image_path = temp_file.name
+            suffix = _sniff_image_suffix(bytes(image_buf.getbuffer()[:4]))
+            if suffix is None:
+                self.send_error(415, "Unsupported or corrupt image")
+                return
 
-            try:
-                # Analyze the image using our programmatic function
-                result = analyze_image_programmatically(
-                    temp_image_path,
-                    crop_type=crop_type,
-                    growth_stage=growth_stage,
-                    location=location,
-                    language=language
-                )
-
-                if result:
-                    # Format the response for the frontend
-                    response = {
-                        "disease": {
-                            "name": result.get("disease", {}).get("name", "Unknown"),
-                            "confidence": result.get("disease", {}).get("confidence", 0.0)
-                        },
-                        "recommended_treatments": result.get("recommended_treatments", []),
-                        "notes": result.get("notes", ""),
-                        "uncertainty_warning": result.get("uncertainty_warning", ""),
-                        "image_warning": result.get("image_warning", ""),
-                        "supporting_heatmap_base64": result.get("supporting_heatmap_base64", "")
-                    }
-                    self.send_json_response(response)
+            crop_type = fields.get('crop_type')
+            growth_stage = fields.get('growth_stage')
+            location = fields.get('location')
+            language = fields.get('language', 'en')
+
+            # Analyze the image; the sniffed suffix gives the validator
+            # the true format. With a warm worker pool the analysis runs
+            # in a pre-initialized process, otherwise inline.
+            analyze_kwargs = {
+                'image_path': 'upload' + suffix,
+                'crop_type': crop_type,
+                'growth_stage': growth_stage,
+                'location': location,
+                'language': language,
+            }
+            # blake2b over the upload is orders of magnitude cheaper
+            # than a model forward pass
+            cache_key = (
+                hashlib.blake2b(image_buf.getbuffer(), digest_size=16).digest(),
+                crop_type, growth_stage, location, language,
+            )
+            result = _analysis_cache_get(cache_key)
+            if result is None:
+                executor = getattr(self.server, 'executor', None)
+                if executor is not None:
+                    analyze_kwargs['image_bytes'] = bytes(image_buf.getbuffer())
+                    result = executor.submit(
+                        _analyze_in_worker, analyze_kwargs
+                    ).result(timeout=ANALYSIS_TIMEOUT_S)
                 else:
-                    self.send_error(500, "Analysis failed")
-            finally:
-                # Clean up temporary file
-                try:
-                    os.unlink(temp_image_path)
-                except:
-                    pass
+                    result = analyze_image_programmatically(
+                        image_bytes=image_buf.getbuffer(), **analyze_kwargs
+                    )
+                if result and not result.get('error'):
+                    _analysis_cache_put(cache_key, result)
+
+            if result:
+                # Format the response for the frontend
+                response = {
+                    "disease": {
+                        "name": result.get("disease", {}).get("name", "Unknown"),
+                        "confidence": result.get("disease", {}).get("confidence", 0.0)
+                    },
+                    "recommended_treatments": result.get("recommended_treatments", []),
+                    "notes": result.get("notes", ""),
+                    "uncertainty_warning": result.get("uncertainty_warning", ""),
+                    "image_warning": result.get("image_warning", ""),
+                    "supporting_heatmap_base64": result.get("supporting_heatmap_base64", "")
+                }
+                self.send_json_response(response)
+            else:
+                self.send_error(500, "Analysis failed")
 
         except Exception as e:
             logger.error(f"Error in analyze handler: {e}")
             self.send_error(500, f"Analysis failed: {str(e)}")
 
+    def _send_headers_and_body(self, body):
+        """Emit buffered headers plus body in one gather-write.
+
+        end_headers would flush the header block as its own write; with
+        the unbuffered response socket that means two syscalls (and
+        potentially two TCP segments) per response. sendmsg sends both
+        in one.
+        """
+        self._headers_buffer.append(b'\r\n')
+        buffers = [b''.join(self._headers_buffer), body]
+        self._headers_buffer = []
+        sent = self.connection.sendmsg(buffers)
+        total = len(buffers[0]) + len(buffers[1])
+        if sent < total:
+            # sendmsg may write short on a full socket buffer; a
+            # truncated response would desync the keep-alive connection
+            self.connection.sendall(b''.join(buffers)[sent:])
+
     def send_json_response(self, data):
         """Send JSON response with CORS headers"""
-        response = json.dumps(data, indent=2)
+        body = _json_response_bytes(data)
         self.send_response(200)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-        self.wfile.write(response.encode('utf-8'))
+        self.send_header('Content-Length', str(len(body)))
+        self._send_headers_and_body(body)
 
     def log_message(self, format, *args):
         """Override to use our logger"""
@@ -187,7 +530,16 @@ class PlantCareHandler(BaseHTTPRequestHandler):
 def run_server(port=8000):
     """Run the web server"""
     server_address = ('', port)
-    httpd = HTTPServer(server_address, PlantCareHandler)
+    # ThreadingHTTPServer handles each connection on its own daemon
+    # thread, so a slow upload no longer blocks every other client the
+    # way the serial HTTPServer did
+    httpd = ThreadingHTTPServer(server_address, PlantCareHandler)
+
+    # Warm worker pool for the CPU-bound analysis: engines load once per
+    # worker, and inference no longer shares the GIL with HTTP serving
+    httpd.executor = ProcessPoolExecutor(
+        max_workers=os.cpu_count(), initializer=_warm_worker
+    )
     
     logger.info(f"Starting Plant Care web server on port {port}")
     logger.info(f"Open http://localhost:{port} to view the website")
@@ -197,6 +549,7 @@ def run_server(port=8000):
         httpd.serve_forever()
     except KeyboardInterrupt:
         logger.info("Shutting down server...")
+        httpd.executor.shutdown(wait=False)
         httpd.shutdown()
 
 if __name__ == "__main__":